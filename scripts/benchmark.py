@@ -0,0 +1,668 @@
+#!/usr/bin/env python3
+"""
+번역 파이프라인 벤치마크
+sample_state.json의 페이지로 각 단계의 처리 속도를 측정
+
+- micro: PageSplitter.split/iter_pages, MarkdownPreserver, find_chapter_positions
+- pipeline: 로컬 가짜 Ollama 서버를 띄워 translate → export → split_chapters 전체 실행
+  (export_chapters로 한 번에 내보내는 경우도 함께 측정)
+- --check: 상태 파일 저장/복구와 페이지 구분자 처리 자체 점검 (--check, 실패하면 종료 코드 1)
+"""
+
+import io
+import re
+import math
+import json
+import time
+import random
+import socket
+import sys
+import argparse
+import resource
+import tempfile
+import threading
+import tracemalloc
+import contextlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Dict, List
+
+import split_chapters
+from concurrent.futures import ThreadPoolExecutor
+from translator import (BookTranslator, Glossary, MarkdownPreserver, PageSplitter, RequestPacker,
+                        StageProfiler, TranslationState, TranslationStatus)
+
+
+class SequentialMarkdownPreserver:
+    """비교 기준: 패턴마다 re.sub를 한 번씩 돌리던 이전 MarkdownPreserver"""
+
+    def __init__(self):
+        self.preserved = {}
+        self.counter = 0
+
+    def protect(self, text: str) -> str:
+        self.preserved = {}
+        self.counter = 0
+        result = text
+
+        for pattern, tag in MarkdownPreserver.PRESERVE_PATTERNS:
+            flags = re.MULTILINE | re.DOTALL if 'table' in pattern.lower() else re.MULTILINE
+
+            def replace_match(match):
+                placeholder = f"__PRESERVED_{self.counter}_{tag}__"
+                self.preserved[placeholder] = match.group(0)
+                self.counter += 1
+                return placeholder
+
+            result = re.sub(pattern, replace_match, result, flags=flags)
+
+        return result
+
+    def restore(self, text: str) -> str:
+        result = text
+        for placeholder, original in self.preserved.items():
+            result = result.replace(placeholder, original)
+        return result
+
+
+def load_pages(state_file: Path) -> List[str]:
+    """상태 파일에서 원문 페이지 목록 읽기"""
+    with open(state_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [data["pages"][k]["content"] for k in sorted(data["pages"], key=int)]
+
+
+def bench_preserver(pages: List[str], repeat: int):
+    """MarkdownPreserver protect/restore 마이크로 벤치마크"""
+    print(f"\n[MarkdownPreserver] {len(pages)}개 페이지 x {repeat}회")
+
+    # 결과가 이전 구현과 바이트 단위로 같은지 먼저 확인
+    mismatches = 0
+    for text in pages:
+        old, new = SequentialMarkdownPreserver(), MarkdownPreserver()
+        protected = old.protect(text)
+        if new.protect(text) != protected or old.preserved != new.preserved:
+            mismatches += 1
+        elif new.restore(protected) != old.restore(protected):
+            mismatches += 1
+    print(f"  이전 구현과 다른 페이지: {mismatches}개")
+
+    _time_preservers(pages, repeat)
+
+    # 플레이스홀더가 수백 개인 페이지에서는 restore 비용 차이가 두드러진다
+    dense = "## Page 0\n\n" + "\n".join(
+        f"See [link {i}](http://example.com/{i}) and `code_{i}` here." for i in range(400))
+    print("\n[MarkdownPreserver] 링크/인라인 코드 800개짜리 페이지")
+    _time_preservers([dense], repeat * 10)
+
+
+def _time_preservers(pages: List[str], repeat: int):
+    """이전/현재 구현의 페이지당 protect/restore 시간 출력"""
+    for name, cls in (("이전(패턴별 순차)", SequentialMarkdownPreserver),
+                      ("현재(단일 스캔)", MarkdownPreserver)):
+        preserver = cls()
+        protect_time = restore_time = 0.0
+        for _ in range(repeat):
+            for text in pages:
+                start = time.perf_counter()
+                protected = preserver.protect(text)
+                middle = time.perf_counter()
+                preserver.restore(protected)
+                protect_time += middle - start
+                restore_time += time.perf_counter() - middle
+
+        per_page = 1e6 / (len(pages) * repeat)
+        print(f"  {name:<16} protect {protect_time * per_page:8.1f}µs/페이지"
+              f"  restore {restore_time * per_page:8.1f}µs/페이지")
+
+
+def bench_splitter(pages: List[str], repeat: int):
+    """PageSplitter.split / iter_pages 마이크로 벤치마크 (최대 메모리 포함)"""
+    book = '\n\n'.join(pages)
+    print(f"\n[PageSplitter] {len(book) / 1024 / 1024:.2f}MB, {len(pages)}개 페이지")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book_file = Path(tmp) / "book.md"
+        book_file.write_text(book, encoding='utf-8')
+
+        splitters = [
+            ("split", lambda: PageSplitter.split(book_file.read_text(encoding='utf-8'))),
+            ("iter_pages", lambda: {ref[0]: ref for ref in PageSplitter.iter_pages(book_file)}),
+        ]
+        for name, run in splitters:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                run()
+            elapsed = (time.perf_counter() - start) / repeat
+
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print(f"  {name:<16} {elapsed * 1000:8.2f}ms/회  ({len(book) / elapsed / 1024 / 1024:.1f}MB/s)"
+                  f"  최대 메모리 {peak / 1024 / 1024:.2f}MB")
+
+
+def bench_chapters(pages: List[str], repeat: int):
+    """find_chapter_positions 마이크로 벤치마크"""
+    book = '\n\n---\n\n'.join(pages)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        positions = split_chapters.find_chapter_positions(book)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"\n[find_chapter_positions] {len(book) / 1024 / 1024:.2f}MB, 챕터 {len(positions)}개 발견")
+    print(f"  {elapsed * 1000:8.2f}ms/회")
+
+
+class MockOllamaServer:
+    """Ollama /api/generate를 흉내 내는 로컬 HTTP 서버
+
+    원문을 그대로 돌려주는 가짜 번역으로 응답하며, 지연 시간과 토큰 생성 속도,
+    오류 비율을 설정할 수 있다. 스트리밍(NDJSON)과 일반 응답을 모두 지원한다.
+    capacity를 주면 Ollama의 OLLAMA_NUM_PARALLEL처럼 그 수만큼만 동시에 처리하고
+    나머지는 줄을 세우며, 줄이 max_queue를 넘으면 503으로 거절한다.
+    load_time을 주면 모델이 내려가 있을 때 첫 요청이 그만큼 더 걸리고
+    load_duration으로 보고하며, keep_alive=0 요청을 받으면 모델을 내린다.
+    """
+
+    PROMPT_BODY = re.compile(r'번역하세요:\n\n(.*)\n\n번역 결과:', re.DOTALL)
+
+    def __init__(self, latency: float = 0.05, token_rate: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0, port: int = 0,
+                 capacity: int = 0, max_queue: int = 0, load_time: float = 0.0):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.slots = threading.Semaphore(capacity) if capacity else None
+        self.waiting = 0
+        self.rejected = 0
+        self.load_time = load_time
+        self.load_lock = threading.Lock()
+        self.loaded = False
+        self.loads = 0
+        self.unloads = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == "/api/version":
+                    self._send_json(200, {"version": "0.0.0-mock"})
+                elif self.path in ("/api/tags", "/api/ps"):
+                    self._send_json(200, {"models": []})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path != "/api/generate":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                server.handle_generate(self, body)
+
+            def _send_json(self, status: int, payload: dict):
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def handle_generate(self, handler, body: dict):
+        """생성 요청 처리 (처리 슬롯이 비기를 기다린 시간은 total_duration에 넣지 않음)"""
+        if not self.slots:
+            self._generate(handler, body)
+            return
+
+        with self.lock:
+            if self.max_queue and self.waiting >= self.max_queue:
+                self.rejected += 1
+                reject = True
+            else:
+                self.waiting += 1
+                reject = False
+        if reject:
+            handler._send_json(503, {"error": "server busy, please try again"})
+            return
+
+        with self.slots:
+            with self.lock:
+                self.waiting -= 1
+            self._generate(handler, body)
+
+    def _load(self) -> int:
+        """모델이 내려가 있으면 올림 (걸린 시간을 나노초로 반환)"""
+        with self.load_lock:
+            if self.loaded:
+                return 0
+            time.sleep(self.load_time)
+            self.loaded = True
+            self.loads += 1
+            return int(self.load_time * 1e9)
+
+    def _generate(self, handler, body: dict):
+        """가짜 번역 생성"""
+        if body.get("keep_alive") == 0 and not body.get("prompt"):
+            with self.load_lock:
+                if self.loaded:
+                    self.loaded = False
+                    self.unloads += 1
+            handler._send_json(200, {"model": body.get("model", ""), "response": "",
+                                     "done": True, "done_reason": "unload"})
+            return
+
+        load_duration = self._load()
+        with self.lock:
+            self.requests += 1
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+
+        started = time.perf_counter() - load_duration / 1e9
+        time.sleep(self.latency)
+        if failed:
+            handler._send_json(500, {"error": "injected failure"})
+            return
+
+        match = self.PROMPT_BODY.search(body.get("prompt", ""))
+        text = match.group(1) if match else body.get("prompt", "")
+        tokens = [text[i:i + 4] for i in range(0, len(text), 4)]
+        prompt_tokens = len(body.get("prompt", "")) // 4
+
+        def stats() -> dict:
+            elapsed = int((time.perf_counter() - started) * 1e9)
+            return {
+                "model": body.get("model", ""),
+                "done": True,
+                "done_reason": "stop",
+                "total_duration": elapsed,
+                "load_duration": load_duration,
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int(self.latency * 1e9),
+                "eval_count": len(tokens),
+                "eval_duration": max(elapsed - int(self.latency * 1e9), 0),
+            }
+
+        if not body.get("stream", True):
+            if self.token_rate:
+                time.sleep(len(tokens) / self.token_rate)
+            handler._send_json(200, dict(stats(), response=text))
+            return
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/x-ndjson")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def write_line(payload: dict):
+            data = json.dumps(payload, ensure_ascii=False).encode('utf-8') + b"\n"
+            handler.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+        for token in tokens:
+            if self.token_rate:
+                time.sleep(1 / self.token_rate)
+            write_line({"model": body.get("model", ""), "response": token, "done": False})
+        write_line(dict(stats(), response=""))
+        handler.wfile.write(b"0\r\n\r\n")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """백분위수 (최근접 순위)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def _instrument(translator: BookTranslator) -> Dict[str, list]:
+    """요청 지연 시간과 상태 파일 기록량을 재도록 계측 래퍼 설치"""
+    measured = {"latency": [], "state_bytes": [0]}
+    lock = threading.Lock()
+
+    def record_latency(start: float):
+        with lock:
+            measured["latency"].append(time.perf_counter() - start)
+
+    def timed_stream(stream, start: float):
+        # 스트리밍 요청은 마지막 조각을 받을 때까지를 지연 시간으로 잰다
+        try:
+            yield from stream
+        finally:
+            record_latency(start)
+
+    def timed(generate):
+        def timed_generate(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = generate(*args, **kwargs)
+            except Exception:
+                record_latency(start)
+                raise
+            if kwargs.get("stream"):
+                return timed_stream(result, start)
+            record_latency(start)
+            return result
+        return timed_generate
+
+    for endpoint in translator.translator.pool.endpoints:
+        endpoint.client.generate = timed(endpoint.client.generate)
+
+    backend = translator.state.backend
+    save, record = backend.save, backend.record
+
+    def counted_save(data):
+        save(data)
+        measured["state_bytes"][0] += backend.state_file.stat().st_size
+
+    def counted_record(page_num, changes, state):
+        before = backend.journal_file.stat().st_size if backend.journal_file.exists() else 0
+        record(page_num, changes, state)
+        if backend.journal_file.exists():
+            measured["state_bytes"][0] += max(backend.journal_file.stat().st_size - before, 0)
+
+    backend.save, backend.record = counted_save, counted_record
+    return measured
+
+
+def _closed_port_url() -> str:
+    """아무도 듣고 있지 않은 포트 주소 (죽은 호스트 흉내)"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def bench_pipeline(pages: List[str], args):
+    """가짜 Ollama 서버로 translate → export → split_chapters 전체 실행"""
+    if args.pages:
+        pages = pages[:args.pages]
+
+    print(f"\n[파이프라인] {len(pages)}개 페이지, 동시 작업 {args.workers}, "
+          f"지연 {args.latency * 1000:.0f}ms, 토큰 속도 {args.token_rate or '무제한'}, "
+          f"오류 비율 {args.error_rate:.0%}, 상태 저장 {args.state_backend}, "
+          f"호스트 {args.hosts}개 (응답 없음 {args.dead_hosts}개)")
+
+    with contextlib.ExitStack() as stack:
+        servers = [
+            stack.enter_context(MockOllamaServer(latency=args.latency, token_rate=args.token_rate,
+                                                 error_rate=args.error_rate, seed=args.seed + i,
+                                                 capacity=args.capacity, max_queue=args.max_queue,
+                                                 load_time=args.load_time))
+            for i in range(args.hosts)
+        ]
+        hosts = [server.url for server in servers] + [_closed_port_url() for _ in range(args.dead_hosts)]
+        work_dir = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        (work_dir / "book.md").write_text('\n\n'.join(pages), encoding='utf-8')
+
+        translator = BookTranslator(
+            input_file=str(work_dir / "book.md"),
+            output_file=str(work_dir / "book_ko.md"),
+            state_file=str(work_dir / "translation_state.json"),
+            model="mock",
+            state_backend=args.state_backend,
+            stream=args.stream,
+            host=hosts
+        )
+        measured = _instrument(translator)
+
+        timings = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            translator.translate(workers=args.workers)
+            timings["translate"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            translator.export()
+            timings["export"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            split_chapters.main(base_dir=work_dir)
+            timings["split_chapters"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            translator.export_chapters(work_dir / "fused")
+            timings["export_chapters"] = time.perf_counter() - start
+
+        completed = sum(1 for p in translator.state.pages.values() if p.status == "completed")
+        latency = measured["latency"]
+        chapter_files = len(list((work_dir / "src" / "chapters").glob("chapter*.md")))
+        pool_summary = translator.translator.pool.summary()
+        controller_summary = translator.translator.controller.summary()
+
+    requests = sum(server.requests for server in servers)
+    errors = sum(server.errors for server in servers)
+    rejected = sum(server.rejected for server in servers)
+    loads = sum(server.loads for server in servers)
+    unloads = sum(server.unloads for server in servers)
+    print(f"  완료 페이지: {completed}/{len(pages)}  요청: {requests}회 (주입된 오류 {errors}회, "
+          f"과부하 거절 {rejected}회)")
+    print(f"  {controller_summary}")
+    if args.load_time:
+        print(f"  모델 로드 {loads}회, 해제 {unloads}회 (로드당 {args.load_time:.1f}초)")
+    print(f"  처리량: {completed / timings['translate']:.1f} pages/s  "
+          f"(translate {timings['translate']:.2f}s, export {timings['export'] * 1000:.1f}ms, "
+          f"split_chapters {timings['split_chapters'] * 1000:.1f}ms, 챕터 파일 {chapter_files}개)")
+    print(f"  챕터로 바로 내보내기: {timings['export_chapters'] * 1000:.1f}ms "
+          f"(export + split_chapters {(timings['export'] + timings['split_chapters']) * 1000:.1f}ms)")
+    print(f"  요청 지연: p50 {percentile(latency, 50) * 1000:.1f}ms  "
+          f"p95 {percentile(latency, 95) * 1000:.1f}ms  p99 {percentile(latency, 99) * 1000:.1f}ms")
+    print(f"  상태 파일 기록량: {measured['state_bytes'][0] / 1024 / 1024:.2f}MB")
+    if len(hosts) > 1:
+        print(pool_summary)
+    # Linux에서 ru_maxrss 단위는 KB
+    print(f"  최대 RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f}MB")
+
+
+CHECK_BOOK = "## Page 1\n\nFirst paragraph.\n\nSecond paragraph.\n\n## Page 2\n\nThird paragraph.\n"
+
+
+def run_checks(base_dir: Path) -> bool:
+    """자체 점검: 상태 저장/저널 복구, 이전 형식 상태, 오래된 색인, 페이지 구분자, 챕터 경계
+
+    Returns:
+        모두 통과하면 True
+    """
+    failures = []
+
+    def check(name: str, ok: bool):
+        print(f"  {'통과' if ok else '실패'}  {name}")
+        if not ok:
+            failures.append(name)
+
+    print("\n[자체 점검]")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        book_file = tmp / "book.md"
+        book_file.write_text(CHECK_BOOK, encoding='utf-8')
+        refs = list(PageSplitter.iter_pages(book_file))
+
+        # 저장 → 저널 기록 → 잘린 마지막 줄 → 다시 읽기
+        state_file = tmp / "state.json"
+        state = TranslationState(str(state_file))
+        state.metadata["source_file"] = str(book_file)
+        for ref in refs:
+            state.add_page(*ref)
+        state.save()
+        source = state.page_content(1)
+        state.update_page(1, translated="번역", status=TranslationStatus.COMPLETED,
+                          paragraphs=PageSplitter.source_index(source))
+        state.update_page(2, status=TranslationStatus.FAILED, error="timeout")
+        journal = state.backend.journal_file
+        intact = journal.stat().st_size
+        with open(journal, 'a', encoding='utf-8') as f:
+            f.write('{"page_num": 2, "changes": {"status": "comp')
+
+        reloaded = TranslationState(str(state_file))
+        with contextlib.redirect_stdout(io.StringIO()):
+            page1, page2 = reloaded.pages[1], reloaded.pages[2]
+        check("저널 재생 후 완료 페이지와 문단 해시 복구",
+              page1.status == "completed" and page1.translated == "번역"
+              and page1.paragraphs == PageSplitter.source_index(source))
+        check("잘린 마지막 저널 줄은 버림", page2.status == "failed" and page2.error == "timeout")
+        check("잘린 저널 줄을 잘라냄", journal.stat().st_size == intact)
+        check("상태별 페이지 수", reloaded.summary()["counts"] == {"completed": 1, "failed": 1})
+        reloaded.save()
+        check("저장 후 다시 읽어도 같음",
+              TranslationState(str(state_file)).pages[1].translated == "번역")
+
+        # 스냅샷이 바뀌면 색인을 쓰지 않음
+        check("최신 색인 사용", TranslationState(str(state_file)).summary()["indexed"])
+        data = state_file.read_bytes()
+        state_file.write_bytes(data.replace(b'"timeout"', b'"timeout2"'))
+        stale = TranslationState(str(state_file))
+        check("스냅샷이 바뀐 뒤의 색인은 버림",
+              stale.backend.load_index() is None and not stale.summary()["indexed"])
+
+        # 이전 형식 (indent=2, 원문 사본 content 포함)
+        legacy_file = tmp / "legacy.json"
+        pages = PageSplitter.split(CHECK_BOOK)
+        legacy = {
+            "metadata": {"source_file": str(book_file), "total_pages": len(pages), "model": "",
+                         "started_at": "", "last_updated": ""},
+            "pages": {str(num): {"page_num": num, "content": content, "translated": "번역",
+                                 "status": "completed", "error": None, "timestamp": None}
+                      for num, content in pages.items()},
+        }
+        legacy_file.write_text(json.dumps(legacy, ensure_ascii=False, indent=2), encoding='utf-8')
+        legacy_state = TranslationState(str(legacy_file))
+        check("이전 형식 상태 읽기",
+              legacy_state.page_content(1) == pages[1] and legacy_state.summary()["counts"] == {"completed": 2})
+        changed = [ref[0] for ref in refs if legacy_state.add_page(*ref)]
+        page = legacy_state.pages[1]
+        check("이전 형식 상태를 원문 위치로 변환",
+              not changed and page.content is None and page.status == "completed"
+              and page.paragraphs == PageSplitter.source_index(pages[1])
+              and legacy_state.page_content(1) == pages[1])
+
+    # 묶은 요청의 페이지 구분자
+    joined = RequestPacker.join_pages([(1, "하나"), (2, "둘"), (3, "셋")])
+    marker = RequestPacker.PAGE_MARKER
+    check("페이지 구분자 분리", RequestPacker.split_pages(joined, [1, 2, 3]) == {1: "하나", 2: "둘", 3: "셋"})
+    check("빠진 구분자는 None",
+          RequestPacker.split_pages(joined.replace(marker.format(2), ""), [1, 2, 3]) is None)
+    check("중복된 구분자는 None",
+          RequestPacker.split_pages(joined.replace(marker.format(3), marker.format(2)), [1, 2, 3]) is None)
+
+    # --profile --workers N: 작업 스레드가 있어도 cProfile을 켜고 저장할 수 있어야 함
+    # (3.12부터는 프로파일 하나만 켤 수 있으므로 두 방식을 모두 점검)
+    for per_thread in sorted({StageProfiler.PER_THREAD_CPROFILE, False}):
+        with tempfile.TemporaryDirectory() as tmp:
+            out_file = Path(tmp) / "profile.pstats"
+            profiler = StageProfiler(cprofile_file=out_file)
+            profiler.PER_THREAD_CPROFILE = per_thread
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    profiler.start()
+                    try:
+                        with ThreadPoolExecutor(max_workers=3) as executor:
+                            list(executor.map(MarkdownPreserver().protect, [CHECK_BOOK] * 6))
+                    finally:
+                        profiler.stop()
+                    profiler.report()
+                ok = out_file.exists() and bool(profiler.samples["protect"])
+            except Exception as e:
+                print(f"  {type(e).__name__}: {e}")
+                ok = False
+            check(f"작업 스레드와 함께 cProfile 저장 ({'스레드별' if per_thread else '프로파일 하나'})", ok)
+
+    # 용어집 번역은 챕터 한글 제목과 같은 말을 써야 함 (제목과 본문이 어긋나지 않도록)
+    glossary_file = base_dir / "glossary.json"
+    if glossary_file.exists():
+        glossary = Glossary.load(glossary_file)
+        conflicts = []
+        for num, eng_title, ko_title in split_chapters.CHAPTERS:
+            for term in glossary.find(eng_title):
+                rendering = glossary.entries[term.lower()][1]
+                if rendering and rendering not in ko_title:
+                    conflicts.append(f"{term} → {rendering} (챕터 {num}: {ko_title})")
+        for conflict in conflicts:
+            print(f"        {conflict}")
+        check("용어집 번역이 챕터 제목과 같음", not conflicts)
+
+    # 챕터 경계는 번호 순으로만 나와야 함 (미주의 "## Chapter N:"이 챕터를 다시 열지 않도록)
+    headings = "# CHAPTER ONE\n\n본문\n\n## CHAPTER TWO\n\n본문\n\n## Chapter 1: 미주\n\n## Chapter 3: 미주\n"
+    check("미주의 챕터 헤딩은 이미 지난 챕터를 다시 열지 않음",
+          [num for _, num, _ in split_chapters.find_chapter_positions(headings)] == [1, 2, 3])
+    book_ko = base_dir / "book_ko.md"
+    if book_ko.exists():
+        positions = split_chapters.find_chapter_positions(book_ko.read_text(encoding='utf-8'))
+        check(f"{book_ko.name} 챕터 위치와 번호가 함께 증가 ({len(positions)}개 챕터)",
+              all(a[0] < b[0] and a[1] < b[1] for a, b in zip(positions, positions[1:])))
+    else:
+        print(f"  건너뜀  {book_ko.name}이 없어 실제 책의 챕터 경계는 점검하지 않음")
+
+    print(f"  {len(failures)}개 실패" if failures else "  모두 통과")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="번역 파이프라인 벤치마크")
+    parser.add_argument("--suite", choices=["all", "micro", "pipeline"], default="all",
+                        help="실행할 벤치마크 (기본: all)")
+    parser.add_argument("--state", "-s", default="sample_state.json", help="페이지를 읽을 상태 파일")
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="마이크로 벤치마크 반복 횟수")
+    parser.add_argument("--pages", type=int, metavar="N", help="파이프라인에 사용할 페이지 수 (기본: 전체)")
+    parser.add_argument("--workers", "-w", type=int, default=4, help="동시 작업 수 (기본: 4)")
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 서버 요청당 지연(초, 기본: 0.05)")
+    parser.add_argument("--token-rate", type=float, default=0.0,
+                        help="가짜 서버 초당 토큰 수 (0이면 지연 없음)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="가짜 서버 오류 응답 비율 (0~1)")
+    parser.add_argument("--seed", type=int, default=0, help="오류 주입 난수 시드")
+    parser.add_argument("--state-backend", choices=["journal", "json"], default="journal",
+                        help="상태 저장 방식")
+    parser.add_argument("--stream", action="store_true", help="스트리밍 생성 사용")
+    parser.add_argument("--capacity", type=int, default=0,
+                        help="가짜 서버가 동시에 처리하는 요청 수 (0이면 제한 없음)")
+    parser.add_argument("--max-queue", type=int, default=0,
+                        help="가짜 서버 대기열 한도, 넘으면 503 (0이면 제한 없음)")
+    parser.add_argument("--load-time", type=float, default=0.0,
+                        help="가짜 서버의 모델 로드 시간(초). 내려가 있을 때 첫 요청에 더해짐 (기본: 0)")
+    parser.add_argument("--hosts", type=int, default=1, help="띄울 가짜 서버 수 (기본: 1)")
+    parser.add_argument("--dead-hosts", type=int, default=0, help="추가할 응답 없는 호스트 수 (기본: 0)")
+
+    parser.add_argument("--check", action="store_true", help="벤치마크 대신 자체 점검만 실행")
+
+    args = parser.parse_args()
+
+    base_dir = Path(__file__).parent.parent
+    if args.check:
+        sys.exit(0 if run_checks(base_dir) else 1)
+
+    pages = load_pages(base_dir / args.state)
+
+    if args.suite in ("all", "micro"):
+        bench_splitter(pages, args.repeat)
+        bench_preserver(pages, args.repeat)
+        bench_chapters(pages, args.repeat)
+
+    if args.suite in ("all", "pipeline"):
+        bench_pipeline(pages, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,18 @@
 번역된 book_ko.md를 챕터별로 분할하여 mdBook 구조로 변환
 """
 
+import os
 import re
+import json
+import argparse
+import shutil
+import hashlib
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 
 # 챕터 정보 (챕터 번호, 시작 텍스트, 한글 제목)
@@ -38,31 +47,72 @@ CHAPTERS = [
 ]
 
 
-def find_chapter_positions(text: str) -> List[Tuple[int, int, str]]:
-    """챕터 시작 위치 찾기"""
+NUMBER_WORDS = [
+    "ONE", "TWO", "THREE", "FOUR", "FIVE", "SIX", "SEVEN", "EIGHT", "NINE", "TEN",
+    "ELEVEN", "TWELVE", "THIRTEEN", "FOURTEEN", "FIFTEEN", "SIXTEEN", "SEVENTEEN",
+    "EIGHTEEN", "NINETEEN", "TWENTY", "TWENTY-ONE", "TWENTY-TWO", "TWENTY-THREE",
+    "TWENTY-FOUR", "TWENTY-FIVE",
+]
+
+
+def _build_heading_pattern() -> "re.Pattern":
+    """모든 챕터 제목과 번호를 한 번에 찾는 패턴
+
+    "# CHAPTER 12"의 12가 챕터 1로 잡히지 않도록 숫자는 통째로 읽고,
+    "CHAPTER TWENTY-ONE"이 TWENTY로 잡히지 않도록 긴 낱말을 먼저 맞춘다.
+    """
+    words = sorted(NUMBER_WORDS, key=len, reverse=True)
+    titles = sorted((eng_title for _, eng_title, _ in CHAPTERS), key=len, reverse=True)
+    return re.compile(
+        r'#{1,2}\s*(?:'
+        r'CHAPTER\s+(?P<word>' + '|'.join(words) + r')\b(?!-)'
+        r'|CHAPTER\b[^\n\d]*(?P<num>\d+)'
+        r'|(?P<title>' + '|'.join(map(re.escape, titles)) + r')'
+        r')',
+        re.IGNORECASE
+    )
+
+
+HEADING_PATTERN = _build_heading_pattern()
+CHAPTER_BY_TITLE = {eng_title.lower(): (chapter_num, ko_title) for chapter_num, eng_title, ko_title in CHAPTERS}
+CHAPTER_BY_NUM = {chapter_num: (chapter_num, ko_title) for chapter_num, _, ko_title in CHAPTERS}
+
+
+def find_chapter_positions(text: str, skip=()) -> List[Tuple[int, int, str]]:
+    """챕터 시작 위치 찾기 (skip은 앞에서 이미 찾은 챕터)
+
+    텍스트를 한 번만 훑으며 헤딩(제목, 숫자 또는 영어 낱말 번호)을 찾는다. 챕터 번호는
+    앞에서 받아들인 챕터보다 커야 하므로, 뒤쪽 미주의 "## Chapter N:" 줄이 이미 지난
+    챕터를 다시 열지 않는다. 본문에 헤딩이 없는 챕터는 빠진다.
+    """
     positions = []
+    last = max(skip, default=0)
+    final = max(CHAPTER_BY_NUM)
 
-    for chapter_num, eng_title, ko_title in CHAPTERS:
-        # 다양한 챕터 헤딩 패턴 검색
-        patterns = [
-            rf"# CHAPTER {chapter_num}",
-            rf"# CHAPTER.*?{chapter_num}",
-            rf"# {eng_title}",
-            rf"#{1,2}\s*{eng_title}",
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                positions.append((match.start(), chapter_num, ko_title))
-                break
+    for match in HEADING_PATTERN.finditer(text):
+        if last >= final:
+            break
+
+        if match.group("title"):
+            chapter = CHAPTER_BY_TITLE[match.group("title").lower()]
+        elif match.group("word"):
+            chapter = CHAPTER_BY_NUM.get(NUMBER_WORDS.index(match.group("word").upper()) + 1)
+        else:
+            chapter = CHAPTER_BY_NUM.get(int(match.group("num")))
+
+        if chapter is None or chapter[0] <= last:
+            continue
+        last = chapter[0]
+        positions.append((match.start(), chapter[0], chapter[1]))
 
-    return sorted(positions, key=lambda x: x[0])
+    return positions
 
 
-def split_into_chapters(text: str) -> Dict[int, Tuple[str, str]]:
-    """텍스트를 챕터별로 분할"""
-    positions = find_chapter_positions(text)
+def split_into_chapters(text: str, positions: Optional[List[Tuple[int, int, str]]] = None
+                        ) -> Dict[int, Tuple[str, str]]:
+    """텍스트를 챕터별로 분할 (positions를 주면 챕터 위치를 다시 찾지 않음)"""
+    if positions is None:
+        positions = find_chapter_positions(text)
     chapters = {}
 
     for i, (pos, chapter_num, ko_title) in enumerate(positions):
@@ -91,17 +141,9 @@ def create_summary(chapters: Dict[int, Tuple[str, str]]) -> str:
     return "\n".join(lines)
 
 
-def create_introduction(text: str) -> str:
-    """소개 페이지 생성 (챕터 1 이전 내용)"""
-    positions = find_chapter_positions(text)
+DEFAULT_INTRODUCTION = "# 게임 디자인의 예술\n\nJesse Schell 저"
 
-    if positions:
-        first_chapter_pos = positions[0][0]
-        intro_content = text[:first_chapter_pos].strip()
-    else:
-        intro_content = "# 게임 디자인의 예술\n\nJesse Schell 저"
-
-    return f"""# 게임 디자인의 예술
+INTRODUCTION_TEMPLATE = """# 게임 디자인의 예술
 
 ## A Book of Lenses
 
@@ -117,14 +159,671 @@ def create_introduction(text: str) -> str:
 """
 
 
-def main():
-    base_dir = Path(__file__).parent.parent
-    input_file = base_dir / "book_ko.md"
-    src_dir = base_dir / "src"
-    chapters_dir = src_dir / "chapters"
+def create_introduction(text: str, positions: Optional[List[Tuple[int, int, str]]] = None) -> str:
+    """소개 페이지 생성 (챕터 1 이전 내용, positions를 주면 챕터 위치를 다시 찾지 않음)"""
+    if positions is None:
+        positions = find_chapter_positions(text)
+
+    if positions:
+        first_chapter_pos = positions[0][0]
+        intro_content = text[:first_chapter_pos].strip()
+    else:
+        intro_content = DEFAULT_INTRODUCTION
 
-    # 디렉토리 생성
-    chapters_dir.mkdir(parents=True, exist_ok=True)
+    return INTRODUCTION_TEMPLATE.format(intro_content=intro_content)
+
+
+class SearchIndexBuilder:
+    """mdBook 기본 검색 대신 쓰는 한국어 n-gram 검색 색인 (src/search)
+
+    한글·한자는 어절 안에서 두 글자씩(bigram), 영문·숫자는 낱말 단위로 자른다.
+    색인은 조각의 첫 글자 코드로 나눈 BUCKETS개 파일(terms/XX.json)과 문서별 절 목록
+    (docs/<문서>.json)으로 나눠 두어, 브라우저는 검색어에 필요한 파일만 받는다.
+    index.json에 문서별 내용 해시를 남겨 바뀐 문서가 들어 있는 조각만 다시 쓴다.
+    theme/ko-search.js가 같은 규칙으로 검색어를 자른다.
+    """
+
+    FORMAT = {"version": 1, "ngram": 2, "buckets": 128}
+    TEASER_LENGTH = 120
+
+    TOKEN_PATTERN = re.compile(r'[가-힣ㄱ-ㆎ一-鿿]+|[0-9a-zÀ-ɏ]+')
+    HEADING_LINE = re.compile(r'(#{1,6})\s+(.+?)\s*#*\s*')
+    FENCE_LINE = re.compile(r'\s*(```|~~~)')
+    MARKUP_PATTERNS = [
+        (re.compile(r'<[^>]*>'), ' '),                      # HTML 태그
+        (re.compile(r'!?\[([^\]]*)\]\([^)]*\)'), r'\1'),    # 이미지·링크는 글자만
+        (re.compile(r'[*_`#>|]+|-{3,}'), ' '),             # 강조, 인용, 표, 구분선
+        (re.compile(r'\s+'), ' '),
+    ]
+
+    def __init__(self, src_dir: Path):
+        self.src_dir = Path(src_dir)
+        self.search_dir = self.src_dir / "search"
+        self.manifest_file = self.search_dir / "index.json"
+        self._buckets: Dict[int, Dict[str, Dict[str, List[int]]]] = {}
+        self._dirty: set = set()
+        self._reset = False
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        """검색 조각으로 분할 (한글·한자 어절은 bigram, 한 글자 어절은 그대로)"""
+        n = cls.FORMAT["ngram"]
+        tokens = []
+        for match in cls.TOKEN_PATTERN.finditer(text.lower()):
+            word = match.group(0)
+            if word[0] < 'ㄱ' or len(word) <= n:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + n] for i in range(len(word) - n + 1))
+        return tokens
+
+    @classmethod
+    def bucket_of(cls, token: str) -> int:
+        return ord(token[0]) % cls.FORMAT["buckets"]
+
+    @classmethod
+    def plain(cls, markdown: str) -> str:
+        """마크다운 표시를 걷어낸 본문"""
+        for pattern, repl in cls.MARKUP_PATTERNS:
+            markdown = pattern.sub(repl, markdown)
+        return markdown.strip()
+
+    @staticmethod
+    def anchor(title: str, seen: Dict[str, int]) -> str:
+        """mdBook과 같은 규칙의 헤딩 id (같은 id가 다시 나오면 -1, -2를 붙임)"""
+        chars = []
+        for c in title:
+            if c.isalnum() or c in '_-':
+                chars.append(c.lower() if c.isascii() else c)
+            elif c.isspace():
+                chars.append('-')
+        base = ''.join(chars)
+        count = seen.get(base, 0)
+        seen[base] = count + 1
+        return f"{base}-{count}" if count else base
+
+    @classmethod
+    def sections(cls, text: str, title: str) -> List[Tuple[str, str, str]]:
+        """헤딩 기준 절 목록 (헤딩 id, 제목, 본문). 첫 헤딩 앞 내용은 문서 제목으로 묶는다"""
+        sections = [("", title, [])]
+        seen: Dict[str, int] = {}
+        fenced = False
+        for line in text.split('\n'):
+            if cls.FENCE_LINE.match(line):
+                fenced = not fenced
+            match = None if fenced else cls.HEADING_LINE.fullmatch(line)
+            if match:
+                heading = cls.plain(match.group(2))
+                sections.append((cls.anchor(heading, seen), heading, []))
+            else:
+                sections[-1][2].append(line)
+        return [(anchor, heading, cls.plain('\n'.join(lines)))
+                for anchor, heading, lines in sections if anchor or any(l.strip() for l in lines)]
+
+    def update(self, sources: Iterable[Path]) -> List[str]:
+        """문서 목록에 맞춰 색인 갱신 (내용이 바뀐 문서만 다시 색인)
+
+        Args:
+            sources: 색인할 마크다운 파일 (src 아래, 목록에 없는 문서는 색인에서 뺀다)
+
+        Returns:
+            다시 색인한 문서 키 목록
+        """
+        manifest = self._load_manifest()
+        entries = manifest["documents"]
+        documents = {Path(path).stem: Path(path) for path in sources}
+
+        updated = []
+        for key in [key for key in entries if key not in documents]:
+            self._remove(key, entries.pop(key))
+            (self.search_dir / "docs" / f"{key}.json").unlink(missing_ok=True)
+            updated.append(key)
+
+        for key, path in documents.items():
+            text = path.read_text(encoding='utf-8')
+            content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+            if key in entries and entries[key]["hash"] == content_hash:
+                continue
+            if key in entries:
+                self._remove(key, entries[key])
+            entries[key] = self._add(key, path, text, content_hash)
+            updated.append(key)
+
+        for bucket in sorted(self._dirty):
+            postings = self._bucket(bucket)
+            path = self.search_dir / "terms" / f"{bucket:02x}.json"
+            if postings:
+                self._write(path, postings)
+            else:
+                path.unlink(missing_ok=True)
+
+        if updated or self._reset:
+            manifest["documents"] = dict(sorted(entries.items()))
+            self._write(self.manifest_file, manifest)
+        return updated
+
+    def _load_manifest(self) -> dict:
+        if self.manifest_file.exists():
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("format") == self.FORMAT:
+                return manifest
+        # 처음 만들거나 형식이 바뀌면 모든 조각을 새로 쓴다
+        self._reset = True
+        self._dirty.update(range(self.FORMAT["buckets"]))
+        return {"format": self.FORMAT, "documents": {}}
+
+    def _bucket(self, bucket: int) -> Dict[str, Dict[str, List[int]]]:
+        if bucket not in self._buckets:
+            path = self.search_dir / "terms" / f"{bucket:02x}.json"
+            postings = {}
+            if not self._reset and path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    postings = json.load(f)
+            self._buckets[bucket] = postings
+        return self._buckets[bucket]
+
+    def _remove(self, key: str, entry: dict):
+        """문서가 들어 있던 조각에서 문서 항목을 뺌"""
+        mask = int(entry["buckets"], 16)
+        for bucket in range(self.FORMAT["buckets"]):
+            if not mask >> bucket & 1:
+                continue
+            postings = self._bucket(bucket)
+            for token in [t for t, docs in postings.items() if key in docs]:
+                del postings[token][key]
+                if not postings[token]:
+                    del postings[token]
+            self._dirty.add(bucket)
+
+    def _add(self, key: str, path: Path, text: str, content_hash: str) -> dict:
+        """문서를 색인해 조각에 넣고 index.json 항목을 돌려줌"""
+        match = self.HEADING_LINE.fullmatch(text.split('\n', 1)[0])
+        title = self.plain(match.group(2)) if match else key
+        sections = self.sections(text, title)
+
+        # 문서 안에서 조각별 (절 번호, 빈도) 목록을 먼저 모은 뒤 조각 파일에 나눠 넣는다
+        postings: Dict[str, List[int]] = {}
+        for num, (_, heading, body) in enumerate(sections):
+            for token, count in Counter(self.tokenize(f"{heading} {body}")).items():
+                postings.setdefault(token, []).extend((num, count))
+
+        mask = 0
+        for token, entries in postings.items():
+            bucket = self.bucket_of(token)
+            self._bucket(bucket).setdefault(token, {})[key] = entries
+            mask |= 1 << bucket
+        self._dirty.update(b for b in range(self.FORMAT["buckets"]) if mask >> b & 1)
+
+        self._write(self.search_dir / "docs" / f"{key}.json",
+                    [[anchor, heading, body[:self.TEASER_LENGTH]] for anchor, heading, body in sections])
+        return {
+            "path": path.relative_to(self.src_dir).with_suffix(".html").as_posix(),
+            "title": title,
+            "hash": content_hash,
+            "sections": len(sections),
+            "buckets": f"{mask:0{self.FORMAT['buckets'] // 4}x}",
+        }
+
+    @staticmethod
+    def _write(path: Path, data):
+        """간결한 JSON으로 쓰되 내용이 같으면 파일을 건드리지 않음"""
+        text = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        if path.exists() and path.read_text(encoding='utf-8') == text:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, path)
+
+
+SUMMARY_LINK = re.compile(r'\]\((?:\./)?([^)#\s]+\.md)\)')
+
+
+def build_search_index(src_dir: Path) -> List[str]:
+    """SUMMARY.md에 실린 문서로 src/search 색인 생성 (mdbook build 전에 실행)
+
+    Returns:
+        다시 색인한 문서 키 목록
+    """
+    src_dir = Path(src_dir)
+    summary = (src_dir / "SUMMARY.md").read_text(encoding='utf-8')
+    sources = [src_dir / rel for rel in SUMMARY_LINK.findall(summary)]
+    return SearchIndexBuilder(src_dir).update(path for path in sources if path.exists())
+
+
+def _import_pillow():
+    """Pillow가 있으면 PIL.Image, 없으면 None (크기별 변형 없이 원본만 복사)"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+def _make_image_variants(source: str, out_dir: str, content_hash: str,
+                         widths: Sequence[int]) -> List[str]:
+    """원본 이미지 하나로 너비별 WebP/JPEG 변형 생성 (프로세스 풀에서 실행)"""
+    Image = _import_pillow()
+    names = []
+    with Image.open(source) as image:
+        image = image.convert("RGB")
+        for width in widths:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for ext, fmt, options in ImageAssets.FORMATS:
+                path = Path(out_dir) / f"{content_hash}-{width}.{ext}"
+                tmp_path = path.with_name(path.name + ".tmp")
+                resized.save(tmp_path, format=fmt, **options)
+                os.replace(tmp_path, path)
+                names.append(path.name)
+    return names
+
+
+class ImageAssets:
+    """챕터에 들어가는 이미지를 모아 내용 해시로 중복을 없애고 크기별 변형을 만든다
+
+    rewrite()가 챕터를 쓰는 동안 <img> 태그를 찾아 원본(imgs/...)을 확인하고 태그를
+    src/images의 해시 이름 파일과 srcset, loading="lazy"로 바꾼다. 참조를 refs에 모으면
+    use()로 넘긴 것만 이번에 쓰인 이미지가 된다 (ChapterWriter는 남기는 챕터만 넘김).
+    build()는 쓰인 이미지 중 변형이 아직 없는 것만 프로세스 풀에서 만든다. 원본 크기·수정 시각과 해시, 이미지 크기는
+    MANIFEST_NAME 파일에 남겨 다음 실행에서 바뀌지 않은 원본은 다시 읽지 않는다.
+    Pillow가 없으면 변형 없이 원본을 해시 이름으로 복사만 한다.
+    """
+
+    MANIFEST_NAME = "images_manifest.json"
+    WIDTHS = (400, 800, 1200)
+    CONTENT_WIDTH = 750  # mdBook 본문 최대 너비 (px)
+    FORMATS = [
+        ("webp", "WEBP", {"quality": 80, "method": 4}),
+        ("jpg", "JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+    ]
+
+    TAG_PATTERN = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+    SRC_PATTERN = re.compile(r'\bsrc\s*=\s*"([^"]*)"', re.IGNORECASE)
+    PERCENT_PATTERN = re.compile(r'\bwidth\s*=\s*"(\d+(?:\.\d+)?)%"', re.IGNORECASE)
+    EXTERNAL_PATTERN = re.compile(r'^(?:[a-z][a-z0-9+.-]*:|/)', re.IGNORECASE)
+    BUILT_PATTERN = re.compile(r'[0-9a-f]{16}(?:-\d+)?\.\w+')
+
+    def __init__(self, base_dir: Path, out_dir: Path, workers: Optional[int] = None):
+        self.base_dir = Path(base_dir)
+        self.out_dir = Path(out_dir)
+        self.manifest_file = self.base_dir / self.MANIFEST_NAME
+        self.workers = workers
+        self.pillow = _import_pillow()
+        self.manifest = {"sources": {}, "images": {}}
+        if self.manifest_file.exists():
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                self.manifest.update(json.load(f))
+        self.used: Dict[str, Path] = {}  # 이번에 쓰인 이미지 (내용 해시 → 원본)
+        self.sources: set = set()
+        self.missing: set = set()
+        self.tags = 0
+        self._resolved: Dict[str, Optional[Tuple[str, dict]]] = {}
+
+    def rewrite(self, text: str, page_dir: Path, refs: Optional[Counter] = None) -> str:
+        """본문의 <img> 태그를 변형 이미지를 가리키도록 바꿈
+
+        Args:
+            page_dir: 본문이 들어갈 파일의 디렉터리
+            refs: 주면 참조한 원본 경로를 여기에 모으고 쓰인 이미지로 등록하지 않는다
+                  (파일을 실제로 남길 때 use()로 넘김)
+        """
+        collected = Counter() if refs is None else refs
+        text = self.TAG_PATTERN.sub(lambda m: self._rewrite_tag(m.group(0), Path(page_dir), collected), text)
+        if refs is None:
+            self.use(collected)
+        return text
+
+    def use(self, refs: Counter):
+        """rewrite()로 모은 참조를 이번에 쓰인 이미지로 등록"""
+        for rel, count in refs.items():
+            self.tags += count
+            if self._resolved[rel] is None:
+                self.missing.add(rel)
+                continue
+            self.sources.add(rel)
+            self.used.setdefault(self._resolved[rel][0], self.base_dir / rel)
+
+    def _rewrite_tag(self, tag: str, page_dir: Path, refs: Counter) -> str:
+        src = self.SRC_PATTERN.search(tag)
+        if not src or self.EXTERNAL_PATTERN.match(src.group(1)):
+            return tag
+        rel = posixpath.normpath(src.group(1))
+        while rel.startswith("../"):
+            rel = rel[3:]
+        path = self.base_dir / rel
+        if self.BUILT_PATTERN.fullmatch(path.name):
+            return tag  # 이미 바꾼 태그
+
+        refs[rel] += 1
+        if rel not in self._resolved:
+            self._resolved[rel] = self._register(path, rel)
+        if self._resolved[rel] is None:
+            return self._lazy(tag)
+        content_hash, entry = self._resolved[rel]
+
+        prefix = Path(os.path.relpath(self.out_dir, page_dir)).as_posix()
+        widths = self._widths(entry)
+        if not widths:
+            return self._lazy(tag.replace(src.group(0), f'src="{prefix}/{content_hash}{entry["ext"]}"'))
+
+        percent = self.PERCENT_PATTERN.search(tag)
+        ratio = float(percent.group(1)) / 100 if percent else 1.0
+        sizes = f"(max-width: {self.CONTENT_WIDTH}px) {ratio * 100:g}vw, {round(self.CONTENT_WIDTH * ratio)}px"
+
+        def srcset(ext: str) -> str:
+            return ", ".join(f"{prefix}/{content_hash}-{w}.{ext} {w}w" for w in widths)
+
+        img = tag.replace(src.group(0), f'src="{prefix}/{content_hash}-{widths[-1]}.jpg" '
+                                        f'srcset="{srcset("jpg")}" sizes="{sizes}"')
+        return (f'<picture><source type="image/webp" srcset="{srcset("webp")}" sizes="{sizes}">'
+                f'{self._lazy(img)}</picture>')
+
+    @staticmethod
+    def _lazy(tag: str) -> str:
+        """loading="lazy", decoding="async" 속성 추가"""
+        if re.search(r'\bloading\s*=', tag, re.IGNORECASE):
+            return tag
+        end = re.search(r'\s*/?>$', tag).group(0)
+        return f'{tag[:-len(end)]} loading="lazy" decoding="async"{end}'
+
+    def _register(self, path: Path, rel: str) -> Optional[Tuple[str, dict]]:
+        """원본 이미지의 내용 해시와 정보 (원본이 없으면 None)"""
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        source = self.manifest["sources"].get(rel)
+        if not (source and source["size"] == stat.st_size and source["mtime_ns"] == stat.st_mtime_ns):
+            source = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": _file_hash(path)}
+            self.manifest["sources"][rel] = source
+        content_hash = source["hash"]
+
+        entry = self.manifest["images"].get(content_hash)
+        if entry is None or (self.pillow and "width" not in entry):
+            entry = {"ext": path.suffix.lower()}
+            if self.pillow:
+                with self.pillow.open(path) as image:
+                    entry["width"], entry["height"] = image.size
+            self.manifest["images"][content_hash] = entry
+        return content_hash, entry
+
+    def _widths(self, entry: dict) -> List[int]:
+        """만들 변형 너비 (원본보다 크게 늘리지 않음, Pillow가 없으면 빈 목록)"""
+        if not self.pillow or "width" not in entry:
+            return []
+        largest = min(entry["width"], self.WIDTHS[-1])
+        return [w for w in self.WIDTHS if w < largest] + [largest]
+
+    def _files(self, content_hash: str, entry: dict) -> List[str]:
+        widths = self._widths(entry)
+        if not widths:
+            return [f"{content_hash}{entry['ext']}"]
+        return [f"{content_hash}-{w}.{ext}" for w in widths for ext, _, _ in self.FORMATS]
+
+    def build(self) -> dict:
+        """이번에 쓰인 이미지 중 변형 파일이 없는 것만 만들고 매니페스트 저장"""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        jobs = []
+        for content_hash, path in self.used.items():
+            entry = self.manifest["images"][content_hash]
+            if not all((self.out_dir / name).exists() for name in self._files(content_hash, entry)):
+                jobs.append((str(path), str(self.out_dir), content_hash, self._widths(entry)))
+
+        if jobs and self.pillow:
+            if len(jobs) > 1 and self.workers != 1:
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    list(executor.map(_make_image_variants, *zip(*jobs)))
+            else:
+                for job in jobs:
+                    _make_image_variants(*job)
+        else:
+            for source, _, content_hash, _ in jobs:
+                target = self.out_dir / f"{content_hash}{Path(source).suffix.lower()}"
+                shutil.copyfile(source, target)
+
+        self.manifest["updated_at"] = datetime.now().isoformat()
+        tmp_path = self.manifest_file.with_name(self.manifest_file.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_file)
+
+        return {
+            "tags": self.tags,
+            "images": len(self.used),
+            "sources": len(self.sources),
+            "built": len(jobs),
+            "missing": len(self.missing),
+            "resized": bool(self.pillow),
+            "source_bytes": sum(path.stat().st_size for path in self.used.values()),
+            "output_bytes": sum((self.out_dir / name).stat().st_size
+                                for content_hash in self.used
+                                for name in self._files(content_hash, self.manifest["images"][content_hash])),
+        }
+
+
+class ChapterWriter:
+    """본문을 앞에서부터 받아 챕터 경계를 만나는 대로 챕터 파일에 바로 나눠 쓴다
+
+    book_ko.md 전체를 문자열로 만들었다가 다시 나누는 대신 페이지 단위로 흘려 쓴다.
+    챕터는 헤딩이 처음 나온 곳에서 시작하고, 각 파일 내용은 split_into_chapters와
+    같도록 앞뒤 공백을 뗀다.
+
+    파일은 임시 파일에 쓴 뒤 내용이 바뀐 경우에만 교체하므로, 그대로인 챕터는
+    수정 시각도 바뀌지 않는다. 무엇이 바뀌었는지는 MANIFEST_NAME 파일에 남긴다.
+    """
+
+    PAGE_SEPARATOR = "\n\n---\n\n"
+    MANIFEST_NAME = "chapters_manifest.json"
+
+    def __init__(self, base_dir: Path, completed_only: bool = False, introduction: bool = True,
+                 search_index: bool = True, images: bool = True):
+        self.base_dir = Path(base_dir)
+        self.src_dir = self.base_dir / "src"
+        self.chapters_dir = self.src_dir / "chapters"
+        self.manifest_file = self.base_dir / self.MANIFEST_NAME
+        self.completed_only = completed_only
+        self.chapters: Dict[int, Tuple[str, str]] = {}  # 발견한 챕터 (번호 → (한글 제목, ""))
+        self.written: List[Path] = []  # 이번에 만든 파일 (내용이 같아 그대로 둔 파일 포함)
+        self.changed: List[Path] = []  # 그중 실제로 내용이 바뀐 파일
+        self.hashes: Dict[Path, str] = {}
+        self.skipped: List[int] = []
+        self.search_index = search_index  # SUMMARY.md에 실린 문서로 src/search 색인 갱신
+        self.search_updated: List[str] = []  # 이번에 다시 색인한 문서
+        # 본문의 이미지를 src/images의 크기별 변형으로 바꿈
+        self.images = ImageAssets(self.base_dir, self.src_dir / "images") if images else None
+        self.image_stats: Dict[str, int] = {}
+        self.pages = 0
+        self._file = None
+        self._section = None
+        self.introduction = introduction  # False면 introduction.md는 건드리지 않음 (add_chapter만 쓸 때)
+        if introduction:
+            self._open(None, None)
+
+    def feed(self, text: str, complete: bool = True):
+        """페이지(또는 본문 일부)를 이어 붙임
+
+        Args:
+            complete: 번역이 끝난 페이지인지 (completed_only일 때 챕터를 쓸지 결정)
+        """
+        if self.pages:
+            self._write(self.PAGE_SEPARATOR, complete)
+        self.pages += 1
+
+        pos = 0
+        for start, chapter_num, ko_title in find_chapter_positions(text, skip=self.chapters):
+            self._write(text[pos:start], complete)
+            self._open(chapter_num, ko_title)
+            pos = start
+        self._write(text[pos:], complete)
+
+    def add_chapter(self, chapter_num: int, ko_title: str, pages: Iterable[Tuple[str, bool]]):
+        """경계를 이미 아는 챕터 하나를 통째로 씀 (헤딩으로 챕터를 찾지 않음)
+
+        Args:
+            pages: (페이지 내용, 번역이 끝났는지)를 순서대로
+        """
+        self._open(chapter_num, ko_title)
+        for i, (text, complete) in enumerate(pages):
+            if i:
+                self._write(self.PAGE_SEPARATOR, complete)
+            self._write(text, complete)
+            self.pages += 1
+        self._finish()
+
+    def close(self) -> Dict[int, Tuple[str, str]]:
+        """마지막 챕터와 SUMMARY.md를 마무리하고 발견한 챕터를 돌려줌"""
+        self._finish()
+
+        if not self.chapters and self.introduction:
+            # 챕터를 하나도 찾지 못하면 소개 페이지에는 기본 문구만 넣는다 (기존 동작)
+            self._open(None, None)
+            self._write(DEFAULT_INTRODUCTION, True)
+            self._finish()
+
+        if self.images:
+            self.image_stats = self.images.build()
+
+        summary_chapters = self.chapters
+        if self.completed_only:
+            summary_chapters = {num: v for num, v in self.chapters.items() if num not in self.skipped}
+        summary_file = self.src_dir / "SUMMARY.md"
+        tmp_path = summary_file.with_name(summary_file.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(create_summary(summary_chapters))
+        self._commit(tmp_path, summary_file)
+
+        if self.search_index:
+            sources = [self.src_dir / "introduction.md"]
+            sources = [path for path in sources if path.exists()]
+            sources += [self.chapters_dir / f"chapter{num:02d}.md" for num in sorted(summary_chapters)]
+            self.search_updated = SearchIndexBuilder(self.src_dir).update(sources)
+
+        self._write_manifest()
+        return self.chapters
+
+    def _open(self, chapter_num: Optional[int], ko_title: Optional[str]):
+        """새 챕터 파일 시작 (chapter_num이 None이면 소개 페이지)"""
+        self._finish()
+        self.chapters_dir.mkdir(parents=True, exist_ok=True)
+
+        if chapter_num is None:
+            path = self.src_dir / "introduction.md"
+            header, footer = INTRODUCTION_TEMPLATE.split("{intro_content}")
+        else:
+            self.chapters[chapter_num] = (ko_title, "")
+            path = self.chapters_dir / f"chapter{chapter_num:02d}.md"
+            header, footer = f"# Chapter {chapter_num}: {ko_title}\n\n", ""
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        self._file = open(tmp_path, 'w', encoding='utf-8')
+        self._file.write(header)
+        self._section = {
+            "chapter_num": chapter_num, "path": path, "tmp_path": tmp_path, "footer": footer,
+            "started": False, "trailing": "", "complete": True, "images": Counter(),
+        }
+
+    def _write(self, text: str, complete: bool):
+        """현재 챕터에 내용 추가 (앞뒤 공백은 strip()과 같게 처리)"""
+        section = self._section
+        if self.images:
+            text = self.images.rewrite(text, section["path"].parent, section["images"])
+        section["complete"] = section["complete"] and complete
+        if not section["started"]:
+            text = text.lstrip()
+            if not text:
+                return
+            section["started"] = True
+
+        # 끝 공백은 뒤에 내용이 더 올 때까지 쓰지 않고 들고 있는다
+        body = text.rstrip()
+        if body:
+            self._file.write(section["trailing"] + body)
+            section["trailing"] = text[len(body):]
+        else:
+            section["trailing"] += text
+
+    def _finish(self):
+        """현재 챕터 파일 닫기 (completed_only면 번역이 끝난 챕터만 교체)"""
+        if self._file is None:
+            return
+        section = self._section
+        self._file.write(section["footer"])
+        self._file.close()
+        self._file = None
+
+        if self.completed_only and not section["complete"]:
+            os.remove(section["tmp_path"])
+            if section["chapter_num"] is not None:
+                self.skipped.append(section["chapter_num"])
+            return
+
+        if self.images:
+            self.images.use(section["images"])
+        self._commit(section["tmp_path"], section["path"])
+
+    def _commit(self, tmp_path: Path, path: Path):
+        """임시 파일을 기존 파일과 비교해 바뀐 경우에만 교체"""
+        content_hash = _file_hash(tmp_path)
+        if path.exists() and _file_hash(path) == content_hash:
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+            self.changed.append(path)
+        self.written.append(path)
+        self.hashes[path] = content_hash
+
+    def _write_manifest(self):
+        """파일별 내용 해시와 이번 실행에서 바뀐 파일 목록 저장
+
+        completed_only로 건너뛴 챕터는 이전 실행의 항목을 그대로 둔다.
+        """
+        files = {}
+        if self.manifest_file.exists():
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                files = json.load(f).get("files", {})
+
+        def key(path: Path) -> str:
+            return path.relative_to(self.base_dir).as_posix()
+
+        files.update({key(path): content_hash for path, content_hash in self.hashes.items()})
+        manifest = {
+            "updated_at": datetime.now().isoformat(),
+            "files": dict(sorted(files.items())),
+            "changed": [key(path) for path in self.changed],
+        }
+
+        tmp_path = self.manifest_file.with_name(self.manifest_file.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_file)
+
+
+def print_image_stats(stats: Dict[str, int]):
+    """ImageAssets.build() 결과 출력"""
+    if not stats.get("tags"):
+        return
+    print(f"이미지: 태그 {stats['tags']}개, 원본 {stats['sources']}개 → 중복 제거 후 {stats['images']}개, "
+          f"새로 만든 이미지 {stats['built']}개")
+    if stats["images"]:
+        print(f"  원본 {stats['source_bytes'] / 1024:.0f}KB → 변형 {stats['output_bytes'] / 1024:.0f}KB")
+    if stats["images"] and not stats["resized"]:
+        print("  Pillow가 없어 크기별 변형 없이 원본을 복사했습니다 (pip install pillow)")
+    if stats["missing"]:
+        print(f"  원본 파일이 없는 이미지 {stats['missing']}개 (loading=\"lazy\"만 추가)")
+
+
+def _file_hash(path: Path) -> str:
+    """파일 내용 해시"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def main(base_dir: Path = None):
+    base_dir = Path(base_dir) if base_dir else Path(__file__).parent.parent
+    input_file = base_dir / "book_ko.md"
 
     # 번역 파일 읽기
     if not input_file.exists():
@@ -136,39 +835,35 @@ def main():
     with open(input_file, 'r', encoding='utf-8') as f:
         text = f.read()
 
-    # 챕터 분할
+    # 챕터 분할 + 소개 페이지, 챕터 파일, SUMMARY.md 생성
     print("챕터 분할 중...")
-    chapters = split_into_chapters(text)
+    writer = ChapterWriter(base_dir)
+    for page in text.split(ChapterWriter.PAGE_SEPARATOR):
+        writer.feed(page)
+    chapters = writer.close()
     print(f"{len(chapters)}개 챕터 발견")
 
-    # 소개 페이지 생성
-    intro_content = create_introduction(text)
-    intro_file = src_dir / "introduction.md"
-    with open(intro_file, 'w', encoding='utf-8') as f:
-        f.write(intro_content)
-    print(f"생성: {intro_file}")
-
-    # 챕터 파일 생성
-    for chapter_num, (ko_title, content) in chapters.items():
-        chapter_file = chapters_dir / f"chapter{chapter_num:02d}.md"
-
-        # 챕터 제목 추가
-        chapter_content = f"# Chapter {chapter_num}: {ko_title}\n\n{content}"
-
-        with open(chapter_file, 'w', encoding='utf-8') as f:
-            f.write(chapter_content)
-
-        print(f"생성: {chapter_file}")
-
-    # SUMMARY.md 생성
-    summary_content = create_summary(chapters)
-    summary_file = src_dir / "SUMMARY.md"
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        f.write(summary_content)
-    print(f"생성: {summary_file}")
+    for path in writer.changed:
+        print(f"생성: {path}")
+    if len(writer.changed) < len(writer.written):
+        print(f"내용이 같아 그대로 둔 파일: {len(writer.written) - len(writer.changed)}개")
+    if writer.search_updated:
+        print(f"검색 색인 갱신: {', '.join(writer.search_updated)}")
+    print_image_stats(writer.image_stats)
+    print(f"변경 목록: {writer.manifest_file}")
 
     print("\n완료! mdbook build 명령으로 빌드할 수 있습니다.")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="번역된 book_ko.md를 챕터별로 분할하여 mdBook 구조로 변환")
+    parser.add_argument("--search-index", action="store_true",
+                        help="챕터는 그대로 두고 src/SUMMARY.md의 문서로 검색 색인(src/search)만 생성 "
+                             "(mdbook build 전에 실행, 색인은 저장소에 넣지 않음)")
+    args = parser.parse_args()
+    if args.search_index:
+        src_dir = Path(__file__).parent.parent / "src"
+        updated = build_search_index(src_dir)
+        print(f"검색 색인: {src_dir / 'search'} (다시 색인한 문서 {len(updated)}개)")
+    else:
+        main()
@@ -4,27 +4,61 @@ Ollama 기반 마크다운 번역기
 book.md를 페이지 단위로 분할하여 한국어로 번역
 """
 
+import os
 import re
+import sys
 import json
 import time
+import random
+import hashlib
+import socket
+import sqlite3
+import threading
 import argparse
+import cProfile
+import functools
+import inspect
+import pstats
+import tracemalloc
+import unicodedata
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from collections import Counter, deque
+from difflib import SequenceMatcher
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor, Future, wait, as_completed,
+                                FIRST_COMPLETED)
 from pathlib import Path
 from datetime import datetime
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional
+from dataclasses import dataclass, asdict, field
+from typing import Callable, Iterable, List, Dict, Optional, Sequence, Tuple, Union
 from enum import Enum
 
-try:
-    import ollama
-except ImportError:
-    print("ollama 패키지가 필요합니다. 설치: pip install ollama")
-    exit(1)
+from split_chapters import CHAPTER_BY_NUM, ChapterWriter, print_image_stats
 
 try:
-    from tqdm import tqdm
-except ImportError:
-    print("tqdm 패키지가 필요합니다. 설치: pip install tqdm")
-    exit(1)
+    import fcntl
+except ImportError:  # Windows: 파일 잠금 없이 한 프로세스만 사용
+    fcntl = None
+
+
+def _import_ollama():
+    """ollama 패키지 (번역할 때만 필요하므로 처음 쓸 때 불러온다)"""
+    try:
+        import ollama
+    except ImportError:
+        print("ollama 패키지가 필요합니다. 설치: pip install ollama")
+        exit(1)
+    return ollama
+
+
+def _import_tqdm():
+    """tqdm 진행 표시줄 (번역할 때만 필요)"""
+    try:
+        from tqdm import tqdm
+    except ImportError:
+        print("tqdm 패키지가 필요합니다. 설치: pip install tqdm")
+        exit(1)
+    return tqdm
+
 
 
 class TranslationStatus(Enum):
@@ -34,21 +68,52 @@ class TranslationStatus(Enum):
     FAILED = "failed"
 
 
-@dataclass
+# 페이지가 수만 개여도 메모리를 덜 쓰도록 __slots__ 사용 (Python 3.10+)
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class PageData:
     """페이지 데이터"""
     page_num: int
-    content: str
+    content: Optional[str] = None  # 이전 형식 상태 파일에만 있음 (지금은 원문 파일 위치만 기록)
     translated: Optional[str] = None
     status: str = "pending"
     error: Optional[str] = None
     timestamp: Optional[str] = None
+    content_hash: Optional[str] = None
+    offset: Optional[int] = None  # 원문 파일에서 페이지가 시작하는 바이트 위치
+    length: Optional[int] = None  # 페이지 바이트 길이
+    paragraphs: Optional[List[str]] = None  # 번역한 원문의 문단 해시 (구분선은 빈 문자열)
+    segments: Optional[Dict[str, str]] = None  # 원문 문단 해시 → 재사용할 기존 번역
+    ttft: Optional[float] = None  # 첫 토큰까지 걸린 시간(초, 스트리밍 모드)
+    # Ollama 응답 측정값 (나노초/토큰 수, 여러 페이지를 묶은 요청은 페이지 수로 나눈 몫)
+    prompt_eval_count: Optional[int] = None
+    prompt_eval_duration: Optional[int] = None
+    eval_count: Optional[int] = None
+    eval_duration: Optional[int] = None
+    load_duration: Optional[int] = None
+    total_duration: Optional[int] = None
+    wall_time: Optional[float] = None  # 요청 처리에 걸린 실제 시간(초)
+    retries: Optional[int] = None
+    issues: Optional[List[str]] = None  # 검증에서 남은 문제 (빈 리스트면 통과, None이면 검증 전)
+    repaired: Optional[int] = None  # 검증에 걸려 다시 번역한 문단 수
+    tier: Optional[str] = None  # 단계별 번역에서 최종 번역을 만든 단계 (draft/full)
+    draft_issues: Optional[List[str]] = None  # 초벌 번역이 큰 모델로 넘어간 이유
+    draft_time: Optional[float] = None  # 넘어가기 전 초벌 번역에 쓴 시간(초)
+    lease_owner: Optional[str] = None  # 번역 중인 작업자 (호스트:PID)
+    lease_expires: Optional[float] = None  # 임대 만료 시각 (epoch 초, 지나면 다른 작업자가 가져감)
+
+
+def _hash_text(text: str) -> str:
+    """내용 해시"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
 
 
 class MarkdownPreserver:
     """마크다운 요소 보존"""
 
-    # 보존할 패턴 (번역하지 않을 요소)
+    # 보존할 패턴 (번역하지 않을 요소, 앞에 있을수록 우선)
     PRESERVE_PATTERNS = [
         (r'<div[^>]*>.*?</div>', 'DIV'),           # div 태그
         (r'<img[^>]*/?>', 'IMG'),                   # img 태그
@@ -62,112 +127,719 @@ class MarkdownPreserver:
         (r'^#+\s*$', 'EMPTYHEADER'),               # 빈 헤더
     ]
 
+    # 모든 패턴을 하나의 alternation으로 합쳐 미리 컴파일 (table만 여러 줄에 걸쳐 매칭).
+    # 맨 앞의 lookahead는 어떤 패턴도 시작할 수 없는 위치를 바로 건너뛰게 한다.
+    ENGINE = re.compile(
+        r'(?=[<!\[`|\-#])(?:' + '|'.join(
+            f"(?P<{tag}>{'(?s:' + pattern + ')' if tag == 'TABLE' else pattern})"
+            for pattern, tag in PRESERVE_PATTERNS
+        ) + ')',
+        re.MULTILINE
+    )
+    PRIORITY = {tag: i for i, (_, tag) in enumerate(PRESERVE_PATTERNS)}
+    PLACEHOLDER = re.compile(r'__PRESERVED_\d+_[A-Z]+__')
+    # 플레이스홀더가 이보다 많을 때만 한 번의 치환으로 복원 (적으면 str.replace 반복이 더 빠르다)
+    SCAN_RESTORE_ABOVE = 16
+
     def __init__(self):
         self.preserved = {}
         self.counter = 0
 
     def protect(self, text: str) -> str:
-        """번역하지 않을 요소 보호"""
-        self.preserved = {}
-        self.counter = 0
-        result = text
+        """번역하지 않을 요소 보호
 
-        for pattern, tag in self.PRESERVE_PATTERNS:
-            flags = re.MULTILINE | re.DOTALL if 'table' in pattern.lower() else re.MULTILINE
+        한 번의 스캔으로 모든 보존 요소를 찾는다. 플레이스홀더 번호는 패턴별로
+        차례로 치환하던 이전 방식과 같도록 (패턴 우선순위, 위치) 순으로 매긴다.
+        """
+        matches = [
+            (self.PRIORITY[m.lastgroup], m.start(), m.end(), m.lastgroup)
+            for m in self.ENGINE.finditer(text)
+        ]
 
-            def replace_match(match):
-                placeholder = f"__PRESERVED_{self.counter}_{tag}__"
-                self.preserved[placeholder] = match.group(0)
-                self.counter += 1
-                return placeholder
+        self.preserved = {}
+        placeholders = {}
+        for counter, (_, start, end, tag) in enumerate(sorted(matches)):
+            placeholder = f"__PRESERVED_{counter}_{tag}__"
+            self.preserved[placeholder] = text[start:end]
+            placeholders[start] = placeholder
+        self.counter = len(matches)
+
+        parts = []
+        pos = 0
+        for _, start, end, _ in matches:
+            parts.append(text[pos:start])
+            parts.append(placeholders[start])
+            pos = end
+        parts.append(text[pos:])
+
+        return ''.join(parts)
 
-            result = re.sub(pattern, replace_match, result, flags=flags)
+    def restore(self, text: str) -> str:
+        """보호된 요소 복원
 
-        return result
+        보통 페이지는 플레이스홀더가 몇 개뿐이라 하나씩 replace하는 편이 빠르고,
+        수백 개인 페이지는 replace가 텍스트를 그만큼 다시 훑으므로 한 번의 치환으로 되돌린다.
+        """
+        preserved = self.preserved
+        if len(preserved) <= self.SCAN_RESTORE_ABOVE:
+            for placeholder, original in preserved.items():
+                text = text.replace(placeholder, original)
+            return text
+        return self.PLACEHOLDER.sub(lambda m: preserved.get(m.group(0), m.group(0)), text)
+
+
+class Glossary:
+    """용어집 (영어 용어 → 한국어 번역, 번역하지 않을 이름)
+
+    모든 용어를 Aho-Corasick 오토마톤 하나로 미리 컴파일해 두고, 번역할 텍스트를
+    한 번 훑어 실제로 나온 항목만 프롬프트에 넣는다. 항목이 수천 개여도 검색은
+    텍스트 길이에 비례하고 프롬프트는 그 페이지에 필요한 만큼만 길어진다.
+
+    파일 형식 (JSON):
+        {"terms": {"interest curve": "흥미 곡선", ...}, "keep": ["Jesse Schell", ...]}
+    """
+
+    MAX_ENTRIES = 40  # 한 요청에 넣을 최대 항목 수
+
+    def __init__(self, terms: Optional[Dict[str, str]] = None,
+                 keep: Sequence[str] = ()):
+        # 소문자 용어 → (원래 표기, 번역 또는 None)
+        self.entries: Dict[str, Tuple[str, Optional[str]]] = {}
+        for name in keep:
+            self.entries[name.lower()] = (name, None)
+        for term, rendering in (terms or {}).items():
+            self.entries[term.lower()] = (term, rendering)
+
+        # goto[state]: 문자 → 다음 상태, fail[state]: 실패 링크,
+        # output[state]: 이 상태에서 끝나는 용어들 (실패 링크를 따라 합쳐 둠)
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[str]] = [[]]
+        for key in self.entries:
+            self._insert(key)
+        self._link()
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Glossary":
+        """JSON 용어집 파일 읽기"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get("terms", {}), data.get("keep", []))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _insert(self, key: str):
+        state = 0
+        for char in key:
+            nxt = self.goto[state].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = nxt
+        self.output[state].append(key)
+
+    def _link(self):
+        """너비 우선으로 실패 링크 계산"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def find(self, text: str) -> List[str]:
+        """텍스트에 나온 용어 (등장 순서, 겹치면 가장 긴 것만)
+
+        대소문자는 구분하지 않고, 단어 중간에서 시작하거나 끝나는 일치는 버린다.
+        """
+        lowered = text.lower()
+        goto, fail, output = self.goto, self.fail, self.output
+        matches = []
+        state = 0
+        for end, char in enumerate(lowered, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for key in output[state]:
+                start = end - len(key)
+                if (start == 0 or not lowered[start - 1].isalnum()) and \
+                        (end == len(lowered) or not lowered[end].isalnum()):
+                    matches.append((start, -end, key))
+
+        found = []
+        seen = set()
+        covered = 0
+        for start, neg_end, key in sorted(matches):
+            if start < covered:
+                continue
+            covered = -neg_end
+            if key not in seen:
+                seen.add(key)
+                found.append(key)
+        return found
+
+    def prompt_for(self, text: str) -> str:
+        """텍스트에 나온 항목만 담은 프롬프트 조각 (없으면 빈 문자열)"""
+        found = self.find(text)[:self.MAX_ENTRIES]
+        if not found:
+            return ""
+        lines = []
+        for key in found:
+            term, rendering = self.entries[key]
+            lines.append(f"- {term} → {rendering}" if rendering else f"- {term} (번역하지 않음)")
+        return "다음 용어집의 번역을 따르세요:\n" + "\n".join(lines) + "\n\n"
+
+
+class JsonStateBackend:
+    """상태 저장소: 매번 전체 상태를 JSON 파일 하나로 다시 쓴다 (기존 방식)"""
+
+    # 색인 파일의 페이지 행 구성 (record_*는 스냅샷 안에서 페이지 레코드의 바이트 위치)
+    INDEX_FIELDS = ("page_num", "status", "record_offset", "record_length",
+                    "lease_owner", "lease_expires", "issues")
+
+    def __init__(self, state_file: Path):
+        self.state_file = state_file
+        self.journal_file = state_file.with_name(state_file.name + ".journal")
+        self.index_file = state_file.with_name(state_file.name + ".index")
+        self.snapshot_stamp = None  # 마지막으로 읽거나 쓴 스냅샷 (다른 프로세스가 새로 썼는지 확인용)
+        self.journal_offset = 0  # 저널에서 이미 반영한 위치
+
+    def load(self) -> Optional[dict]:
+        """스냅샷을 읽고 남아 있는 저널이 있으면 그 위에 재생"""
+        data = None
+        self.snapshot_stamp = self._stamp()
+        self.journal_offset = 0
+        if self.state_file.exists():
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
 
-    def restore(self, text: str) -> str:
-        """보호된 요소 복원"""
-        result = text
-        for placeholder, original in self.preserved.items():
-            result = result.replace(placeholder, original)
-        return result
+        if self.journal_file.exists():
+            data = data or {"metadata": {}, "pages": {}}
+            pages = data.setdefault("pages", {})
+            for record in self.read_journal():
+                page = pages.get(str(record["page_num"]))
+                if page is None:
+                    continue
+                page.update(record["changes"])
+                data.setdefault("metadata", {})["last_updated"] = record["last_updated"]
+
+        return data
+
+    def read_journal(self):
+        """아직 반영하지 않은 저널 레코드를 순서대로 읽음 (중단으로 잘린 마지막 줄은 잘라낸다)"""
+        if not self.journal_file.exists():
+            return
+        with open(self.journal_file, 'rb') as f:
+            f.seek(self.journal_offset)
+            for line_no, line in enumerate(f, 1):
+                if not line.endswith(b"\n"):
+                    print(f"경고: 저널 마지막 줄이 완전하지 않아 버립니다: {self.journal_file}")
+                    break
+                self.journal_offset += len(line)
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"경고: 저널 {line_no}번째 줄이 손상되어 건너뜁니다: {self.journal_file}")
+                    continue
+                yield record
+
+        if self.journal_offset < self.journal_file.stat().st_size:
+            os.truncate(self.journal_file, self.journal_offset)
+
+    def snapshot_changed(self) -> bool:
+        """마지막으로 읽은 뒤 다른 프로세스가 스냅샷을 새로 썼는지"""
+        return self._stamp() != self.snapshot_stamp
+
+    def _stamp(self) -> Optional[Tuple[int, int, int]]:
+        """스냅샷 파일 식별값 (교체되면 inode가 바뀐다)"""
+        try:
+            st = self.state_file.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def save(self, data: dict):
+        """전체 상태 저장
+
+        페이지 레코드를 한 줄에 하나씩 쓰고 그 위치를 색인 파일에 남긴다.
+        파일 전체는 그대로 하나의 JSON 문서다.
+        """
+        def dump(value) -> bytes:
+            return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+        rows = []
+        tmp_file = self.state_file.with_name(self.state_file.name + ".tmp")
+        with open(tmp_file, 'wb') as f:
+            f.write(b'{"metadata": ' + dump(data["metadata"]) + b',\n"pages": {')
+            for i, (key, page) in enumerate(data["pages"].items()):
+                f.write((b',\n' if i else b'\n') + dump(key) + b': ')
+                record = dump(page)
+                rows.append([int(key), page["status"], f.tell(), len(record),
+                             page.get("lease_owner"), page.get("lease_expires"),
+                             len(page.get("issues") or ())])
+                f.write(record)
+            f.write(b'\n}}\n')
+        os.replace(tmp_file, self.state_file)
+
+        if self.journal_file.exists():
+            self.journal_file.unlink()
+        self.snapshot_stamp = self._stamp()
+        self.journal_offset = 0
+
+        index = {"snapshot": self.snapshot_stamp, "fields": self.INDEX_FIELDS,
+                 "metadata": data["metadata"], "pages": rows}
+        tmp_file = self.index_file.with_name(self.index_file.name + ".tmp")
+        tmp_file.write_text(json.dumps(index, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp_file, self.index_file)
+
+    def load_index(self) -> Optional[dict]:
+        """지금 스냅샷과 맞는 색인 (없거나 스냅샷이 그 뒤에 바뀌었으면 None)"""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if (index.get("fields") != list(self.INDEX_FIELDS)
+                or tuple(index.get("snapshot") or ()) != self._stamp()):
+            return None
+        return index
+
+    def record(self, page_num: int, changes: dict, state: "TranslationState"):
+        """페이지 변경 기록"""
+        state.save()
+
+    def record_pages(self, changes: Dict[int, dict], state: "TranslationState"):
+        """여러 페이지의 변경을 한 번에 기록 (전체 상태를 한 번만 다시 쓴다)"""
+        state.save()
+
+
+class JournalStateBackend(JsonStateBackend):
+    """상태 저장소: JSON 스냅샷 + 추가 전용 JSONL 저널
+
+    페이지가 바뀔 때마다 바뀐 필드만 저널에 한 줄씩 덧붙이고,
+    compact_every개 레코드가 쌓이면 스냅샷을 새로 쓰고 저널을 비운다.
+    스냅샷은 임시 파일에 쓴 뒤 교체하므로 중간에 죽어도 이전 스냅샷이 남고,
+    저널 레코드는 같은 값을 덮어쓰는 방식이라 여러 번 재생해도 결과가 같다.
+    """
+
+    def __init__(self, state_file: Path, compact_every: int = 200):
+        super().__init__(state_file)
+        self.compact_every = compact_every
+        self.pending_records = 0
+
+    def save(self, data: dict):
+        """스냅샷 저장 (저널 압축)"""
+        super().save(data)
+        self.pending_records = 0
+
+    def record(self, page_num: int, changes: dict, state: "TranslationState"):
+        """바뀐 필드만 저널에 추가"""
+        self.record_pages({page_num: changes}, state)
+
+    def record_pages(self, changes: Dict[int, dict], state: "TranslationState"):
+        """여러 페이지의 변경을 저널에 한 번에 추가"""
+        last_updated = state.metadata["last_updated"]
+        lines = "".join(
+            json.dumps({"page_num": page_num, "changes": page_changes, "last_updated": last_updated},
+                       ensure_ascii=False) + "\n"
+            for page_num, page_changes in changes.items()
+        )
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            f.write(lines)
+            # 잠금을 잡은 채로 쓰므로 여기까지는 이미 반영된 내용이다
+            self.journal_offset = f.tell()
+
+        self.pending_records += len(changes)
+        if self.pending_records >= self.compact_every:
+            state.save()
+
+
+STATE_BACKENDS = {
+    "json": JsonStateBackend,
+    "journal": JournalStateBackend,
+}
 
 
 class TranslationState:
-    """번역 진행 상태 관리"""
+    """번역 진행 상태 관리
+
+    여러 프로세스(또는 공유 디스크를 쓰는 여러 머신)가 같은 상태 파일로 번역할 수 있다.
+    상태를 바꾸는 쪽은 locked() 안에서 작업하고, 잠금을 잡을 때마다 다른 프로세스가
+    기록한 변경을 먼저 반영한다. 페이지는 claim()으로 임대해 가져가며, 임대가 만료된
+    페이지는 다시 대기열로 돌아간다.
+    """
 
-    def __init__(self, state_file: str):
+    def __init__(self, state_file: str, backend: str = "journal"):
         self.state_file = Path(state_file)
-        self.pages: Dict[int, PageData] = {}
-        self.metadata = {
+        self.lock_file = self.state_file.with_name(self.state_file.name + ".lock")
+        self.backend = STATE_BACKENDS[backend](self.state_file)
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_handle = None
+        # 상태 파일은 pages나 metadata를 처음 쓸 때 읽는다 (status, 내보내기는 색인만으로 처리)
+        self._pages: Optional[Dict[int, PageData]] = None
+        self._metadata = {
             "source_file": "",
             "total_pages": 0,
             "model": "",
             "started_at": "",
             "last_updated": ""
         }
-        self._load()
+        self._counts: Counter = Counter()  # 상태별 페이지 수
+
+    @property
+    def pages(self) -> Dict[int, PageData]:
+        if self._pages is None:
+            self._load()
+        return self._pages
+
+    @property
+    def metadata(self) -> dict:
+        if self._pages is None:
+            self._load()
+        return self._metadata
 
     def _load(self):
         """상태 파일 로드"""
-        if self.state_file.exists():
-            with open(self.state_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.metadata = data.get("metadata", self.metadata)
-                for page_num, page_data in data.get("pages", {}).items():
-                    self.pages[int(page_num)] = PageData(**page_data)
+        data = self.backend.load()
+        self._pages = {}
+        if data:
+            self._metadata = data.get("metadata", self._metadata)
+            for page_num, page_data in data.get("pages", {}).items():
+                self._pages[int(page_num)] = PageData(**page_data)
+        self._counts = Counter(page.status for page in self._pages.values())
+
+    def _set_status(self, page: PageData, status: str):
+        """페이지 상태 변경 (상태별 페이지 수도 함께 갱신)"""
+        self._counts[page.status] -= 1
+        self._counts[status] += 1
+        page.status = status
+
+    def refresh(self):
+        """다른 프로세스가 기록한 변경 반영 (스냅샷이 바뀌었으면 다시 읽고, 아니면 저널 뒷부분만 재생)"""
+        if self._pages is None:
+            return  # 아직 읽지 않았으면 처음 쓸 때 최신 상태를 읽는다
+        if self.backend.snapshot_changed():
+            self._load()
+            return
+
+        for record in self.backend.read_journal():
+            page = self._pages.get(record["page_num"])
+            if page is None:
+                continue
+            for key, value in record["changes"].items():
+                if key == "status":
+                    self._set_status(page, value)
+                else:
+                    setattr(page, key, value)
+            self._metadata["last_updated"] = record["last_updated"]
+
+    def _open_index(self, with_snapshot: bool = True):
+        """색인과 그 뒤 저널 변경을 잠금 안에서 함께 읽음
+
+        Returns:
+            (색인, 스냅샷 파일 또는 None, 페이지별 저널 변경), 색인을 쓸 수 없으면 None
+        """
+        with self.locked():
+            index = self.backend.load_index()
+            if index is None:
+                return None
+            # 잠금을 푼 뒤 다른 프로세스가 스냅샷을 교체해도 열어 둔 파일은 그대로 읽힌다
+            snapshot = open(self.state_file, 'rb') if with_snapshot else None
+            changes: Dict[int, dict] = {}
+            self.backend.journal_offset = 0  # 저널은 색인(스냅샷) 이후의 변경 전부
+            for record in self.backend.read_journal():
+                changes.setdefault(record["page_num"], {}).update(record["changes"])
+                index["metadata"]["last_updated"] = record["last_updated"]
+        self._metadata = index["metadata"]
+        return index, snapshot, changes
+
+    def iter_pages(self) -> Iterable[PageData]:
+        """페이지 번호 순으로 순회
+
+        아직 상태를 읽지 않았고 색인이 최신이면 스냅샷에서 페이지 레코드를 하나씩
+        읽어, 전체 상태를 한꺼번에 파싱하거나 메모리에 올리지 않는다.
+        """
+        view = self._open_index() if self._pages is None else None
+        if view is None:
+            for page_num in sorted(self.pages):
+                yield self.pages[page_num]
+            return
+
+        index, snapshot, changes = view
+        with snapshot:
+            for row in sorted(index["pages"]):
+                snapshot.seek(row[2])
+                page = PageData(**json.loads(snapshot.read(row[3])))
+                for key, value in changes.get(page.page_num, {}).items():
+                    setattr(page, key, value)
+                yield page
+
+    def summary(self) -> dict:
+        """진행 상황 요약 (상태를 아직 읽지 않았으면 색인만 사용)"""
+        view = self._open_index(with_snapshot=False) if self._pages is None else None
+        if view is None:
+            rows = [(p.status, p.lease_owner, p.lease_expires, len(p.issues or ()))
+                    for p in self.pages.values()]
+        else:
+            index, _, changes = view
+            rows = []
+            for num, status, _, _, owner, expires, issues in index["pages"]:
+                changed = changes.get(num, {})
+                rows.append((changed.get("status", status),
+                             changed.get("lease_owner", owner),
+                             changed.get("lease_expires", expires),
+                             len(changed["issues"] or ()) if "issues" in changed else issues))
+
+        now = time.time()
+        counts = Counter(row[0] for row in rows)
+        workers: Dict[str, List[float]] = {}
+        for status, owner, expires, _ in rows:
+            if status == TranslationStatus.IN_PROGRESS.value and owner and expires and expires > now:
+                worker = workers.setdefault(owner, [0, expires])
+                worker[0] += 1
+                worker[1] = min(worker[1], expires)
+        return {
+            "metadata": self._metadata,
+            "pages": len(rows),
+            "counts": dict(counts),
+            "workers": workers,
+            "flagged": sum(1 for row in rows if row[3]),
+            "indexed": view is not None,
+        }
+
+    @contextmanager
+    def locked(self):
+        """상태 파일 잠금 (중첩 가능, 가장 바깥에서 잡을 때 최신 상태로 갱신)"""
+        with self._thread_lock:
+            self._lock_depth += 1
+            try:
+                if self._lock_depth == 1:
+                    self._lock_handle = open(self.lock_file, 'a')
+                    if fcntl:
+                        # NFS에서도 동작하도록 flock 대신 POSIX 잠금 사용
+                        fcntl.lockf(self._lock_handle, fcntl.LOCK_EX)
+                    self.refresh()
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    # 닫으면 잠금도 풀린다
+                    self._lock_handle.close()
+                    self._lock_handle = None
 
     def save(self):
         """상태 파일 저장"""
+        if self._pages is None:
+            return  # 읽지도 바꾸지도 않았음
         self.metadata["last_updated"] = datetime.now().isoformat()
         data = {
             "metadata": self.metadata,
             "pages": {str(k): asdict(v) for k, v in self.pages.items()}
         }
-        with open(self.state_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        self.backend.save(data)
+
+    def add_page(self, page_num: int, offset: int, length: int, content_hash: str) -> bool:
+        """페이지 추가 (원문이 바뀐 기존 페이지는 다시 번역 대기로 돌린다)
+
+        원문 내용은 상태에 복사하지 않고 원문 파일 안의 위치만 기록한다.
 
-    def add_page(self, page_num: int, content: str):
-        """페이지 추가"""
-        if page_num not in self.pages:
+        Returns:
+            새 페이지이거나 원문이 바뀌었으면 True
+        """
+        page = self.pages.get(page_num)
+
+        if page is None:
             self.pages[page_num] = PageData(
                 page_num=page_num,
-                content=content,
-                status=TranslationStatus.PENDING.value
+                status=TranslationStatus.PENDING.value,
+                content_hash=content_hash,
+                offset=offset,
+                length=length
             )
+            self._counts[TranslationStatus.PENDING.value] += 1
+            return True
+
+        if (page.content_hash or _hash_text(page.content)) == content_hash:
+            if page.content is not None:
+                # 이전 형식 상태: 원문 사본을 버리기 전에 문단 해시를 남긴다
+                if page.status == TranslationStatus.COMPLETED.value and not page.paragraphs:
+                    page.paragraphs = PageSplitter.source_index(page.content)
+                page.content = None
+            page.content_hash = content_hash
+            page.offset, page.length = offset, length
+            return False
+
+        self._revise_page(page, offset, length, content_hash)
+        return True
+
+    def _revise_page(self, page: PageData, offset: int, length: int, content_hash: str):
+        """원문이 바뀐 페이지에서 그대로인 문단의 기존 번역을 보관하고 대기열로 복귀"""
+        segments = dict(page.segments or {})
+        if page.status == TranslationStatus.COMPLETED.value and page.translated:
+            index = page.paragraphs
+            if index is None and page.content is not None:
+                index = PageSplitter.source_index(page.content)
+            if index:
+                segments.update(PageSplitter.align_paragraphs(index, page.translated) or {})
+
+        page.content = None
+        page.content_hash = content_hash
+        page.offset, page.length = offset, length
+        page.paragraphs = None
+
+        # 새 원문에 남아 있는 문단만 유지 (구분선은 번역 없이 그대로 쓴다)
+        if segments:
+            current = PageSplitter.paragraphs(self.page_content(page.page_num))
+            hashes = {_hash_text(p) for p in current}
+            segments = {h: t for h, t in segments.items() if h in hashes}
+            if segments:
+                for p in current:
+                    if PageSplitter.RULE_PATTERN.fullmatch(p.strip()):
+                        segments[_hash_text(p)] = p
+
+        page.segments = segments or None
+        self._set_status(page, TranslationStatus.PENDING.value)
+        page.error = None
+        page.draft_issues = None  # 바뀐 원문은 초벌 번역부터 다시
+
+    def page_content(self, page_num: int) -> str:
+        """페이지 원문 (원문 파일에서 필요할 때 읽는다)"""
+        return self.read_source(self.pages[page_num])
+
+    def read_source(self, page: PageData) -> str:
+        """페이지가 가리키는 원문 읽기 (iter_pages로 받은 페이지에도 쓸 수 있다)"""
+        if page.content is not None:
+            return page.content
+
+        source_file = self._metadata.get("source_file")
+        with open(source_file, 'rb') as f:
+            f.seek(page.offset)
+            text = PageSplitter.decode(f.read(page.length))
+
+        if _hash_text(text) != page.content_hash:
+            raise ValueError(f"원문 파일이 상태 파일과 다릅니다 (페이지 {page.page_num}): {source_file}")
+        return text
 
     def update_page(self, page_num: int, translated: str = None,
-                    status: TranslationStatus = None, error: str = None):
-        """페이지 상태 업데이트"""
-        if page_num in self.pages:
-            page = self.pages[page_num]
-            if translated:
-                page.translated = translated
-            if status:
-                page.status = status.value
-            if error:
-                page.error = error
-            page.timestamp = datetime.now().isoformat()
-            self.save()
+                    status: TranslationStatus = None, error: str = None,
+                    metrics: Dict[str, float] = None, paragraphs: Optional[List[str]] = None):
+        """페이지 상태 업데이트
+
+        바꿀 내용을 모두 정한 뒤에 페이지에 반영하므로, 중간에 실패해도 메모리의 상태와
+        기록된 상태가 어긋나지 않는다. 원문 파일은 읽지 않는다 (번역 중에 원문이 바뀌어도
+        완료 처리가 실패하지 않도록).
+
+        Args:
+            paragraphs: 완료한 페이지의 원문 문단 해시 (번역에 쓴 원문으로 계산한 것)
+        """
+        page = self.pages.get(page_num)
+        if page is None:
+            return
+
+        new_status = status.value if status else page.status
+        timestamp = datetime.now().isoformat()
+        changes = {"status": new_status, "timestamp": timestamp}
+        if translated:
+            changes["translated"] = translated
+        if error:
+            changes["error"] = error
+        if status and status != TranslationStatus.IN_PROGRESS and page.lease_owner:
+            changes["lease_owner"] = changes["lease_expires"] = None
+        if new_status == TranslationStatus.COMPLETED.value:
+            if page.segments:
+                changes["segments"] = None
+            if translated and paragraphs is not None:
+                # 나중에 원문이 바뀌면 이 문단 해시로 기존 번역을 맞춰 본다
+                changes["paragraphs"] = paragraphs
+        changes.update(metrics or {})
+
+        self._set_status(page, new_status)
+        for key, value in changes.items():
+            if key != "status":
+                setattr(page, key, value)
+        self.metadata["last_updated"] = timestamp
+        self.backend.record(page_num, changes, self)
+
+    def claim(self, page_nums: List[int], owner: str, lease_seconds: float) -> List[int]:
+        """페이지를 임대해 진행 중으로 표시 (다른 작업자가 먼저 가져간 페이지는 제외)
+
+        Returns:
+            임대한 페이지 번호
+        """
+        now = time.time()
+        claimed = []
+        for page_num in page_nums:
+            page = self.pages.get(page_num)
+            if page is None or not self._claimable(page, now, owner):
+                continue
+            page.lease_owner = owner
+            page.lease_expires = now + lease_seconds
+            self.update_page(page_num, status=TranslationStatus.IN_PROGRESS,
+                             metrics={"lease_owner": owner, "lease_expires": page.lease_expires})
+            claimed.append(page_num)
+        return claimed
+
+    def renew_leases(self, owner: str, lease_seconds: float) -> int:
+        """작업자가 맡은 페이지의 임대 연장 (하트비트, 상태 파일에는 한 번만 기록)"""
+        expires = time.time() + lease_seconds
+        changes = {}
+        for page_num, page in self.pages.items():
+            if page.lease_owner == owner and page.status == TranslationStatus.IN_PROGRESS.value:
+                page.lease_expires = expires
+                changes[page_num] = {"lease_expires": expires}
+        if changes:
+            self.metadata["last_updated"] = datetime.now().isoformat()
+            self.backend.record_pages(changes, self)
+        return len(changes)
+
+    @staticmethod
+    def _claimable(page: PageData, now: float, owner: Optional[str] = None) -> bool:
+        """대기 중이거나, 진행 중이지만 임대가 만료된 페이지인지
+
+        임대 정보 없이 진행 중인 페이지는 이전 실행이 비정상 종료하며 남긴 것으로 본다.
+        """
+        if page.status in [TranslationStatus.PENDING.value, TranslationStatus.FAILED.value]:
+            return True
+        if page.status != TranslationStatus.IN_PROGRESS.value:
+            return False
+        return page.lease_owner == owner or page.lease_expires is None or page.lease_expires < now
 
     def get_pending_pages(self) -> List[int]:
-        """대기 중인 페이지 목록"""
+        """대기 중인 페이지 목록 (임대가 만료된 진행 중 페이지 포함)"""
+        now = time.time()
+        return [num for num, page in self.pages.items() if self._claimable(page, now)]
+
+    def get_leased_pages(self) -> List[int]:
+        """다른 작업자가 임대해 번역 중인 페이지 목록"""
+        now = time.time()
         return [
             num for num, page in self.pages.items()
-            if page.status in [TranslationStatus.PENDING.value, TranslationStatus.FAILED.value]
+            if page.status == TranslationStatus.IN_PROGRESS.value and not self._claimable(page, now)
         ]
 
     def get_completion_rate(self) -> float:
-        """완료율"""
+        """완료율 (상태별 페이지 수를 바뀔 때마다 세어 두므로 페이지 수와 무관)"""
         if not self.pages:
             return 0.0
-        completed = sum(1 for p in self.pages.values() if p.status == TranslationStatus.COMPLETED.value)
-        return (completed / len(self.pages)) * 100
+        return (self._counts[TranslationStatus.COMPLETED.value] / len(self.pages)) * 100
 
 
 class PageSplitter:
     """페이지 단위 분할"""
 
+    HEADER_PATTERN = re.compile(rb'## Page (\d+)\s*')
+    RULE_PATTERN = re.compile(r'-{3,}')
+
     @staticmethod
     def split(text: str) -> Dict[int, str]:
         """## Page N 기준으로 분할"""
@@ -197,6 +869,662 @@ class PageSplitter:
 
         return pages
 
+    @staticmethod
+    def iter_pages(path: Union[str, Path], chunk_size: int = 1024 * 1024, preamble: bool = False):
+        """원문 파일을 조금씩 읽으며 페이지 위치를 차례로 돌려준다
+
+        split()과 같은 기준으로 나누지만 파일 전체를 메모리에 올리지 않는다.
+
+        Args:
+            preamble: True면 첫 ## Page 앞의 내용(챕터 제목 등)도 0번 페이지로 돌려준다
+
+        Yields:
+            (페이지 번호, 바이트 위치, 바이트 길이, 내용 해시)
+        """
+        page_num = 0 if preamble else None
+        start = 0
+        lines: List[bytes] = []
+
+        def finish():
+            # split()처럼 페이지 끝의 공백을 떼고 그 길이만 기록
+            raw = b''.join(lines).rstrip()
+            text = PageSplitter.decode(raw)
+            return page_num, start, len(raw), _hash_text(text)
+
+        offset = 0
+        with open(path, 'rb', buffering=chunk_size) as f:
+            for line in f:
+                match = PageSplitter.HEADER_PATTERN.fullmatch(line) if line.startswith(b'## Page ') else None
+                if match:
+                    if page_num is not None:
+                        ref = finish()
+                        if ref[2] or page_num:  # 비어 있는 머리말은 건너뜀
+                            yield ref
+                    page_num = int(match.group(1))
+                    start = offset
+                    lines = []
+                if page_num is not None:
+                    lines.append(line)
+                offset += len(line)
+
+        if page_num is not None:
+            ref = finish()
+            if ref[2] or page_num:
+                yield ref
+
+    @staticmethod
+    def decode(raw: bytes) -> str:
+        """원문 바이트를 텍스트로 (텍스트 모드로 읽은 것과 같도록 줄바꿈 정리)"""
+        return raw.decode('utf-8').replace('\r\n', '\n').strip()
+
+    @staticmethod
+    def paragraphs(text: str) -> List[str]:
+        """빈 줄 기준 문단 분할"""
+        return [p for p in re.split(r'\n\s*\n', text.strip()) if p.strip()]
+
+    @staticmethod
+    def source_index(text: str) -> List[str]:
+        """원문 문단 해시 목록 (구분선 문단은 빈 문자열)"""
+        return ['' if PageSplitter.RULE_PATTERN.fullmatch(p.strip()) else _hash_text(p)
+                for p in PageSplitter.paragraphs(text)]
+
+    @staticmethod
+    def align_paragraphs(source_index: List[str], translated: str) -> Optional[Dict[str, str]]:
+        """원문 문단과 번역 문단을 1:1로 대응 (원문 문단 해시 → 번역 문단)
+
+        모델이 페이지 끝의 구분선(---)을 빠뜨리는 경우가 많아, 개수가 맞지 않으면
+        구분선을 빼고 다시 맞춰 본다. 그래도 맞지 않으면 None.
+        """
+        src = source_index
+        dst = PageSplitter.paragraphs(translated)
+
+        if len(src) != len(dst):
+            src = [h for h in src if h]
+            dst = [p for p in dst if not PageSplitter.RULE_PATTERN.fullmatch(p.strip())]
+            if len(src) != len(dst):
+                return None
+
+        return {h: d for h, d in zip(src, dst) if h}
+
+
+class TranslationCache:
+    """번역 결과 캐시 (SQLite, 크기 제한 + LRU 제거)
+
+    키는 보호 처리된 원문, 모델 이름, 시스템 프롬프트, 생성 옵션의 해시이고,
+    값은 플레이스홀더가 복원되기 전의 모델 응답이다.
+    """
+
+    def __init__(self, cache_file: str, max_bytes: int = 512 * 1024 * 1024):
+        self.cache_file = Path(cache_file)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # 여러 프로세스가 같은 캐시를 쓰면 잠시 잠길 수 있으므로 넉넉히 기다린다
+        self._conn = sqlite3.connect(str(self.cache_file), check_same_thread=False, timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_lru ON cache (last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+    @staticmethod
+    def make_key(protected_text: str, model: str, system_prompt: str, options: dict) -> str:
+        """캐시 키 생성"""
+        h = hashlib.sha256()
+        for part in (protected_text, model, system_prompt,
+                     json.dumps(options, sort_keys=True)):
+            h.update(part.encode('utf-8'))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시 조회 (적중 시 최근 사용 시각 갱신)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, response: str):
+        """캐시 저장 후 크기 제한을 넘으면 오래된 항목부터 제거"""
+        size = len(response.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+            if old:
+                self._total_bytes -= old[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, response, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, size, time.time()))
+            self._total_bytes += size
+
+            while self._total_bytes > self.max_bytes:
+                victim = self._conn.execute(
+                    "SELECT key, size FROM cache ORDER BY last_access LIMIT 1").fetchone()
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (victim[0],))
+                self._total_bytes -= victim[1]
+                self.evictions += 1
+
+            self._conn.commit()
+
+    def stats(self) -> str:
+        """적중/미스 요약"""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return (f"캐시 적중 {self.hits} / 미스 {self.misses} ({rate:.1f}%), "
+                f"제거 {self.evictions}, 크기 {self._total_bytes / 1024 / 1024:.1f}MB")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TruncatedOutputError(Exception):
+    """모델 출력이 num_predict 한도에서 잘림"""
+
+
+class RequestPacker:
+    """토큰 예산에 맞춰 번역 요청 구성
+
+    짧은 페이지 여러 개는 페이지 구분자를 넣어 한 요청으로 묶고,
+    출력 한도를 넘을 만큼 긴 페이지는 문단 경계에서 나눈다.
+    """
+
+    PAGE_MARKER = "__PRESERVED_PAGE_{}__"
+    PAGE_MARKER_PATTERN = re.compile(r'^[ \t]*__PRESERVED_PAGE_(\d+)__[ \t]*$', re.MULTILINE)
+
+    # 한국어 출력은 같은 내용의 영어 입력보다 토큰을 더 많이 쓴다
+    OUTPUT_RATIO = 2.0
+
+    def __init__(self, max_output_tokens: int = 4096, max_pages: int = 8,
+                 merge_below: int = 200, merge_target: int = 800):
+        # 출력 추정치가 한도의 80%를 넘지 않도록 입력 크기를 제한
+        self.max_input_tokens = int(max_output_tokens * 0.8 / self.OUTPUT_RATIO)
+        self.max_pages = max_pages
+        self.merge_below = merge_below
+        self.merge_target = merge_target
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """토큰 수 추정 (영문 약 4자당 1토큰, 그 외 문자는 1자당 1토큰)"""
+        ascii_chars = len(text.encode('ascii', 'ignore'))
+        return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+    def pack(self, pages: Iterable[Tuple[int, str, Optional[Dict[str, str]]]]) -> List[List[int]]:
+        """연속된 짧은 페이지를 묶어 요청 단위(페이지 번호 목록)로 구성"""
+        jobs = []
+        group: List[int] = []
+        group_tokens = 0
+
+        for page_num, content, segments in pages:
+            tokens = self.estimate_tokens(content)
+            mergeable = self.max_pages > 1 and not segments and tokens <= self.merge_below
+
+            if group and (not mergeable or len(group) >= self.max_pages
+                          or group_tokens + tokens > self.merge_target):
+                jobs.append(group)
+                group, group_tokens = [], 0
+
+            if mergeable:
+                group.append(page_num)
+                group_tokens += tokens
+            else:
+                jobs.append([page_num])
+
+        if group:
+            jobs.append(group)
+        return jobs
+
+    def split_text(self, text: str) -> List[str]:
+        """입력 한도를 넘는 텍스트를 문단(그래도 크면 줄) 경계에서 분할"""
+        if self.estimate_tokens(text) <= self.max_input_tokens:
+            return [text]
+
+        chunks = []
+        current: List[str] = []
+        current_tokens = 0
+
+        for unit, sep in self._units(text):
+            tokens = self.estimate_tokens(unit)
+            if current and current_tokens + tokens > self.max_input_tokens:
+                chunks.append(''.join(current).strip())
+                current, current_tokens = [], 0
+            current.append(unit + sep)
+            current_tokens += tokens
+
+        if current:
+            chunks.append(''.join(current).strip())
+        return chunks
+
+    def _units(self, text: str):
+        """분할 단위 (문단, 한도를 넘는 문단은 줄)와 뒤따르는 구분자"""
+        for paragraph in PageSplitter.paragraphs(text):
+            if self.estimate_tokens(paragraph) <= self.max_input_tokens:
+                yield paragraph, '\n\n'
+            else:
+                lines = paragraph.split('\n')
+                for i, line in enumerate(lines):
+                    yield line, '\n' if i < len(lines) - 1 else '\n\n'
+
+    @staticmethod
+    def halve(text: str) -> Optional[List[str]]:
+        """출력이 잘린 텍스트를 반으로 나눔 (더 나눌 수 없으면 None)"""
+        for parts, sep in ((PageSplitter.paragraphs(text), '\n\n'), (text.strip().split('\n'), '\n')):
+            if len(parts) > 1:
+                mid = len(parts) // 2
+                return [sep.join(parts[:mid]), sep.join(parts[mid:])]
+        return None
+
+    @classmethod
+    def join_pages(cls, pages: List[Tuple[int, str]]) -> str:
+        """여러 페이지를 구분자와 함께 하나의 텍스트로 결합"""
+        return '\n\n'.join(f"{cls.PAGE_MARKER.format(num)}\n\n{content}" for num, content in pages)
+
+    @classmethod
+    def split_pages(cls, text: str, page_nums: List[int]) -> Optional[Dict[int, str]]:
+        """결합 번역 결과를 페이지별로 분리 (구분자가 어긋나면 None)"""
+        markers = list(cls.PAGE_MARKER_PATTERN.finditer(text))
+        if [int(m.group(1)) for m in markers] != page_nums:
+            return None
+
+        pages = {}
+        for i, match in enumerate(markers):
+            end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+            pages[page_nums[i]] = text[match.end():end].strip()
+        return pages
+
+
+class TranslationValidator:
+    """번역 결과 검증
+
+    보호했던 요소(링크, 이미지, 코드 등)가 빠지거나 중복되지 않았는지, 헤더와
+    목록 구조가 유지됐는지, 원문 대비 길이가 정상인지 문단 단위로 확인한다.
+    """
+
+    HEADING = re.compile(r'^(#{1,6})\s')
+    LIST_ITEM = re.compile(r'^\s*(?:[-*+•]|\d+[.)])\s', re.MULTILINE)
+    RESIDUE = re.compile(r'PRESERVED')  # 모델이 바꿔 써서 복원되지 않은 플레이스홀더
+    MIN_RATIO = 0.15          # 번역/원문 글자 수 비율 하한
+    MAX_RATIO = 2.0           # 상한
+    MIN_RATIO_LENGTH = 80     # 이보다 짧은 문단은 길이 비율을 보지 않음
+    MAX_ENGLISH_RATIO = 0.5   # 초벌 번역에 남은 영문 글자 비율 상한
+    MAX_REPEATS = 3           # 같은 문장이 원문보다 이만큼 더 나오면 반복 출력으로 봄
+    LATIN = re.compile(r'[A-Za-z]')
+    HANGUL = re.compile(r'[가-힣]')
+    SENTENCE = re.compile(r'[^.!?。\n]{20,}[.!?。]?')
+
+    @staticmethod
+    def elements(text: str) -> Counter:
+        """보존 요소 목록 (같은 요소가 여러 번 나오면 개수로)"""
+        return Counter(m.group(0) for m in MarkdownPreserver.ENGINE.finditer(text))
+
+    @classmethod
+    def check_paragraph(cls, source: str, translated: str) -> List[str]:
+        """문단 하나 검증 (문제 목록, 없으면 빈 리스트)"""
+        issues = []
+
+        expected, found = cls.elements(source), cls.elements(translated)
+        if expected != found:
+            missing = sum((expected - found).values())
+            extra = sum((found - expected).values())
+            issues.append(f"보존 요소 누락 {missing}개, 중복 {extra}개")
+        if cls.RESIDUE.search(translated) and not cls.RESIDUE.search(source):
+            issues.append("깨진 플레이스홀더")
+
+        src_heading = cls.HEADING.match(source)
+        dst_heading = cls.HEADING.match(translated)
+        if (src_heading and src_heading.group(1)) != (dst_heading and dst_heading.group(1)):
+            issues.append("헤더 구조 불일치")
+
+        src_items = len(cls.LIST_ITEM.findall(source))
+        dst_items = len(cls.LIST_ITEM.findall(translated))
+        if src_items != dst_items:
+            issues.append(f"목록 항목 수 불일치 (원문 {src_items}, 번역 {dst_items})")
+
+        src_length = len(MarkdownPreserver.ENGINE.sub('', source).strip())
+        if src_length >= cls.MIN_RATIO_LENGTH:
+            ratio = len(MarkdownPreserver.ENGINE.sub('', translated).strip()) / src_length
+            if not cls.MIN_RATIO <= ratio <= cls.MAX_RATIO:
+                issues.append(f"길이 비율 {ratio:.2f}")
+
+        return issues
+
+    @classmethod
+    def check_draft(cls, source: str, translated: str) -> List[str]:
+        """초벌 번역 품질 검사 (번역 안 된 영문 비율, 문장 반복)"""
+        issues = []
+        text = MarkdownPreserver.ENGINE.sub('', translated)
+        if len(cls.LATIN.findall(MarkdownPreserver.ENGINE.sub('', source))) >= cls.MIN_RATIO_LENGTH:
+            latin = len(cls.LATIN.findall(text))
+            hangul = len(cls.HANGUL.findall(text))
+            if latin + hangul and latin / (latin + hangul) > cls.MAX_ENGLISH_RATIO:
+                issues.append(f"영문 비율 {latin / (latin + hangul):.2f}")
+
+        expected = Counter(s.strip() for s in cls.SENTENCE.findall(source))
+        found = Counter(s.strip() for s in cls.SENTENCE.findall(text))
+        repeated = [s for s, count in found.items() if count - expected.get(s, 0) >= cls.MAX_REPEATS]
+        if repeated:
+            issues.append(f"반복 문장 {len(repeated)}개")
+        return issues
+
+    @classmethod
+    def signature(cls, paragraph: str) -> tuple:
+        """문단 구조 요약 (구분선 여부, 헤더 수준, 보존 요소)"""
+        heading = cls.HEADING.match(paragraph)
+        return (bool(PageSplitter.RULE_PATTERN.fullmatch(paragraph.strip())),
+                heading.group(1) if heading else "",
+                tuple(sorted(cls.elements(paragraph).items())))
+
+    @classmethod
+    def pair(cls, source: List[str], translated: List[str]) -> Optional[List[Tuple[int, Optional[int]]]]:
+        """원문 문단마다 대응하는 번역 문단 위치 (번역에서 빠졌으면 None)
+
+        개수가 같으면 순서대로 맞춘다. 다르면 문단 구조를 비교해 맞추되, 모델이
+        빠뜨린 문단이 구분선이나 보존 요소·헤더가 있는 문단일 때만 받아들인다.
+        평범한 문단이 빠지거나 합쳐져 위치를 특정할 수 없으면 None.
+        """
+        if len(source) == len(translated):
+            return [(i, i) for i in range(len(source))]
+
+        matcher = SequenceMatcher(None, [cls.signature(p) for p in source],
+                                  [cls.signature(p) for p in translated], autojunk=False)
+        pairs = []
+        for op, i1, i2, j1, j2 in matcher.get_opcodes():
+            if op == "equal" or (op == "replace" and i2 - i1 == j2 - j1):
+                pairs.extend(zip(range(i1, i2), range(j1, j2)))
+            elif op == "delete" and all(cls.signature(source[i]) != (False, "", ()) for i in range(i1, i2)):
+                pairs.extend((i, None) for i in range(i1, i2))
+            elif op == "insert" and all(PageSplitter.RULE_PATTERN.fullmatch(translated[j].strip())
+                                        for j in range(j1, j2)):
+                continue  # 모델이 덧붙인 구분선은 버린다
+            else:
+                return None
+        return pairs
+
+
+class RunawayOutputError(Exception):
+    """스트리밍 중 반복 출력 또는 과도한 출력 길이 감지"""
+
+
+@dataclass
+class RequestContext:
+    """번역 요청 하나에 대한 호출 정보"""
+    metrics: Dict[str, float] = field(default_factory=dict)
+    on_progress: Optional[Callable[[str], None]] = None
+
+
+class Endpoint:
+    """Ollama 서버 하나와 그 상태"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self._client = None
+        self.outstanding = 0   # 진행 중인 요청 수
+        self.errors = 0        # 연속 오류 수
+        self.down = False
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def client(self):
+        """ollama 클라이언트 (내보내기처럼 서버가 필요 없는 실행에서는 만들지 않는다)"""
+        if self._client is None:
+            self._client = _import_ollama().Client(host=self.url)
+        return self._client
+
+
+class EndpointPool:
+    """여러 Ollama 서버에 요청 분산
+
+    진행 중인 요청이 가장 적은 서버를 고르고, 연속으로 MAX_ERRORS번 실패한 서버는
+    제외한다. 제외된 서버는 백그라운드에서 CHECK_INTERVAL초마다 상태를 확인해
+    응답하면 다시 사용한다.
+    """
+
+    MAX_ERRORS = 3
+    CHECK_INTERVAL = 10.0
+
+    def __init__(self, hosts: Sequence[str]):
+        self.endpoints = [Endpoint(url) for url in hosts]
+        self._lock = threading.Lock()
+        self._monitor: Optional[threading.Thread] = None
+
+    def acquire(self, exclude: Sequence[Endpoint] = ()) -> Endpoint:
+        """요청을 보낼 서버 선택 (exclude는 이번 요청에서 이미 실패한 서버)"""
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude] or self.endpoints
+            healthy = [e for e in candidates if not e.down] or candidates
+            endpoint = min(healthy, key=lambda e: (e.outstanding, e.requests))
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, ok: bool):
+        """요청 결과 반영"""
+        with self._lock:
+            endpoint.outstanding -= 1
+            if ok:
+                endpoint.errors = 0
+                return
+
+            endpoint.failures += 1
+            endpoint.errors += 1
+            if endpoint.errors >= self.MAX_ERRORS and not endpoint.down:
+                endpoint.down = True
+                print(f"\n서버 제외: {endpoint.url} (연속 {endpoint.errors}회 실패)")
+                self._start_monitor()
+
+    def has_alternative(self, exclude: Sequence[Endpoint]) -> bool:
+        """이번 요청에서 아직 시도하지 않은 정상 서버가 있는지"""
+        with self._lock:
+            return any(not e.down and e not in exclude for e in self.endpoints)
+
+    def check(self, endpoint: Endpoint) -> bool:
+        """서버 상태 확인"""
+        try:
+            endpoint.client.list()
+        except Exception:
+            return False
+        return True
+
+    def check_all(self):
+        """모든 서버 상태를 확인해 응답하지 않는 서버는 제외"""
+        with ThreadPoolExecutor(max_workers=len(self.endpoints)) as executor:
+            results = list(executor.map(self.check, self.endpoints))
+
+        for endpoint, ok in zip(self.endpoints, results):
+            print(f"서버 {endpoint.url}: {'정상' if ok else '응답 없음'}")
+            if not ok:
+                with self._lock:
+                    endpoint.down = True
+                    endpoint.errors = self.MAX_ERRORS
+                self._start_monitor()
+
+    def _start_monitor(self):
+        """제외된 서버 상태 확인 스레드 시작 (이미 돌고 있으면 무시)"""
+        if self._monitor and self._monitor.is_alive():
+            return
+        self._monitor = threading.Thread(target=self._watch, name="endpoint-monitor", daemon=True)
+        self._monitor.start()
+
+    def _watch(self):
+        """제외된 서버가 다시 응답하면 복귀"""
+        while True:
+            time.sleep(self.CHECK_INTERVAL)
+            with self._lock:
+                down = [e for e in self.endpoints if e.down]
+            if not down:
+                return
+            for endpoint in down:
+                if self.check(endpoint):
+                    with self._lock:
+                        endpoint.down = False
+                        endpoint.errors = 0
+                    print(f"\n서버 복귀: {endpoint.url}")
+
+    def summary(self) -> str:
+        """서버별 요청 수 요약"""
+        return "\n".join(
+            f"  {e.url}: 요청 {e.requests}회, 실패 {e.failures}회{' (제외됨)' if e.down else ''}"
+            for e in self.endpoints
+        )
+
+
+class ConcurrencyController:
+    """서버 상태에 맞춰 동시 요청 수와 재시도 간격 조절 (AIMD)
+
+    대기 시간(요청 왕복 시간 - Ollama가 보고한 처리 시간)이 안정적이면 성공한 요청마다
+    동시 요청 한도를 1/한도씩 늘리고(한 바퀴에 약 1), 타임아웃이나 5xx 응답, 대기 시간
+    증가가 보이면 절반으로 줄인다. 한도가 1까지 내려가면 요청 사이 간격을 늘린다.
+    재시도는 지터를 넣은 지수 백오프로 기다리며, 성공한 요청이 쌓아 주는 예산 안에서만 한다.
+    """
+
+    DECREASE_FACTOR = 0.5
+    QUEUE_TOLERANCE = 2.0       # 최근 최소 대기 시간의 이 배수에
+    QUEUE_SLACK = 0.25          # 이 초를 더한 값을 넘으면 서버가 밀리는 것으로 본다
+    QUEUE_WINDOW = 50           # 최소 대기 시간을 구할 최근 요청 수
+    QUEUE_MIN_SAMPLES = 5
+    PAUSE_STEP = 0.5            # 한도 1에서 혼잡할 때 늘리는 요청 간격(초)
+    MAX_PAUSE = 10.0
+    BACKOFF_BASE = 1.0
+    BACKOFF_CAP = 30.0
+    RETRY_BUDGET_RATIO = 0.2    # 성공 1회당 쌓이는 재시도 횟수
+    RETRY_BUDGET_MAX = 10.0
+
+    def __init__(self, max_limit: int = 1):
+        self._lock = threading.Lock()
+        self.reset(max_limit)
+
+    def reset(self, max_limit: int):
+        """번역 실행마다 초기화 (max_limit는 --workers)"""
+        with self._lock:
+            self.max_limit = max(1, max_limit)
+            self.limit = float(max(1, self.max_limit // 2))
+            self.pause = 0.0
+            self.queue_samples = deque(maxlen=self.QUEUE_WINDOW)
+            self.queue_time: Optional[float] = None  # 대기 시간 지수 이동 평균
+            self.rtt = 1.0                           # 요청 왕복 시간 지수 이동 평균
+            self.cooldown_until = 0.0
+            self.retry_tokens = self.RETRY_BUDGET_MAX
+            self.increases = 0
+            self.decreases = 0
+            self.budget_exhausted = 0
+
+    @property
+    def window(self) -> int:
+        """지금 보낼 수 있는 동시 요청 수"""
+        return int(self.limit)
+
+    def on_success(self, wall_time: float, total_duration: Optional[int] = None):
+        """요청 성공 반영 (total_duration은 Ollama가 보고한 처리 시간, 나노초)"""
+        with self._lock:
+            self.rtt = 0.8 * self.rtt + 0.2 * wall_time
+            self.retry_tokens = min(self.RETRY_BUDGET_MAX, self.retry_tokens + self.RETRY_BUDGET_RATIO)
+
+            if total_duration:
+                queue = max(wall_time - total_duration / 1e9, 0.0)
+                self.queue_samples.append(queue)
+                self.queue_time = queue if self.queue_time is None else 0.8 * self.queue_time + 0.2 * queue
+                threshold = min(self.queue_samples) * self.QUEUE_TOLERANCE + self.QUEUE_SLACK
+                if len(self.queue_samples) >= self.QUEUE_MIN_SAMPLES and self.queue_time > threshold:
+                    self._decrease(f"대기 시간 {self.queue_time:.2f}초")
+                    return
+
+            if self.pause:
+                self.pause = max(self.pause - self.PAUSE_STEP / 4, 0.0)
+            elif self.limit < self.max_limit:
+                before = self.window
+                self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+                if self.window > before:
+                    self.increases += 1
+                    print(f"\n동시 요청 {before} → {self.window}")
+
+    def on_error(self, error: Exception):
+        """요청 실패 반영 (서버 과부하로 보이는 실패만 한도를 줄인다)"""
+        if self.is_overload(error):
+            with self._lock:
+                self._decrease(f"{type(error).__name__}: {str(error)[:60]}")
+
+    @staticmethod
+    def is_overload(error: Exception) -> bool:
+        """타임아웃, 연결 실패, 429/5xx 응답인지"""
+        status = getattr(error, "status_code", None)
+        if isinstance(status, int) and (status == 429 or status >= 500):
+            return True
+        name = type(error).__name__
+        return isinstance(error, (TimeoutError, ConnectionError)) or "Timeout" in name or "Connect" in name
+
+    def _decrease(self, reason: str):
+        """한도를 절반으로 (한도 1이면 요청 간격을 늘림), 한 바퀴 동안은 다시 줄이지 않음"""
+        now = time.monotonic()
+        if now < self.cooldown_until:
+            return
+        self.cooldown_until = now + self.rtt
+        self.queue_time = None
+        self.decreases += 1
+
+        if self.limit > 1:
+            before = self.window
+            self.limit = max(self.limit * self.DECREASE_FACTOR, 1.0)
+            print(f"\n동시 요청 {before} → {self.window} ({reason})")
+        else:
+            self.pause = min(max(self.pause * 2, self.PAUSE_STEP), self.MAX_PAUSE)
+            print(f"\n요청 간격 {self.pause:.1f}초로 늘림 ({reason})")
+
+    def wait(self):
+        """요청 간격이 있으면 다음 요청 전에 기다림"""
+        if self.pause:
+            time.sleep(self.pause)
+
+    def allow_retry(self) -> bool:
+        """재시도 예산이 남아 있으면 하나 사용"""
+        with self._lock:
+            if self.retry_tokens >= 1:
+                self.retry_tokens -= 1
+                return True
+            self.budget_exhausted += 1
+            return False
+
+    def backoff(self, attempt: int) -> float:
+        """재시도 전 대기 시간 (지수 백오프의 절반 + 나머지 절반 안에서 무작위)"""
+        delay = min(self.BACKOFF_BASE * 2 ** attempt, self.BACKOFF_CAP) / 2
+        return max(delay + random.uniform(0, delay), self.pause)
+
+    def describe(self) -> Dict[str, str]:
+        """진행 표시줄에 붙일 현재 상태"""
+        status = {"동시": f"{self.window}/{self.max_limit}"}
+        if self.pause:
+            status["간격"] = f"{self.pause:.1f}s"
+        if self.queue_time is not None:
+            status["대기"] = f"{self.queue_time:.2f}s"
+        return status
+
+    def summary(self) -> str:
+        """실행 요약"""
+        text = (f"동시 요청 조절: 최종 {self.window}/{self.max_limit}, "
+                f"늘림 {self.increases}회, 줄임 {self.decreases}회")
+        if self.budget_exhausted:
+            text += f", 재시도 예산 소진 {self.budget_exhausted}회"
+        return text
+
 
 class OllamaTranslator:
     """Ollama 번역기"""
@@ -216,54 +1544,273 @@ class OllamaTranslator:
 - 불필요한 설명 추가 금지
 - 번역 결과만 출력 (부가 설명 없이)"""
 
-    def __init__(self, model: str = "translategemma", host: str = "http://localhost:11434"):
+    GENERATE_OPTIONS = {
+        "temperature": 0.3,
+        "top_p": 0.9,
+        "num_predict": 4096,
+    }
+
+    # 응답에서 PageData로 옮겨 담을 측정값
+    TELEMETRY_FIELDS = ("prompt_eval_count", "prompt_eval_duration", "eval_count",
+                        "eval_duration", "load_duration", "total_duration")
+
+    # 스트리밍 중 폭주 감지 기준
+    REPEAT_MIN_SPAN = 300       # 같은 구간이 이 길이(글자) 이상 연속 반복되면 중단
+    REPEAT_MAX_PERIOD = 200     # 검사할 반복 단위의 최대 길이
+    REPEAT_CHECK_EVERY = 64     # 반복 검사 간격(글자)
+    PROGRESS_INTERVAL = 5.0     # 중간 결과 저장 간격(초)
+    RETRY_REPEAT_PENALTY = 1.3  # 폭주로 중단된 뒤 재시도할 때의 repeat_penalty
+
+    WARMUP_PROMPT = "."         # 모델 준비용 요청 (시스템 프롬프트와 함께 보낸다)
+
+    def __init__(self, model: str = "translategemma",
+                 host: Union[str, Sequence[str]] = "http://localhost:11434",
+                 cache: Optional[TranslationCache] = None,
+                 stream: bool = False, max_output_ratio: float = 3.0,
+                 keep_alive: Union[str, float] = "30m",
+                 glossary: Optional[Glossary] = None,
+                 pool: Optional[EndpointPool] = None,
+                 controller: Optional[ConcurrencyController] = None):
         self.model = model
-        self.client = ollama.Client(host=host)
-        self.preservor = MarkdownPreserver()
-
-    def translate(self, text: str, max_retries: int = 3) -> str:
-        """텍스트 번역"""
+        self.glossary = glossary
+        self.keep_alive = keep_alive
+        # 같은 서버에 모델만 다르게 보내는 번역기끼리는 서버 목록과 동시성 조절을 공유
+        self.pool = pool or EndpointPool([host] if isinstance(host, str) else host)
+        self.controller = controller or ConcurrencyController()
+        self.cache = cache
+        self.stream = stream
+        self.max_output_ratio = max_output_ratio
+
+    def translate(self, text: str, max_retries: int = 3,
+                  context: Optional[RequestContext] = None) -> str:
+        """텍스트 번역
+
+        여러 스레드에서 동시에 호출될 수 있으므로 플레이스홀더 테이블은
+        호출마다 새 MarkdownPreserver에 보관한다.
+        """
+        context = context or RequestContext()
         # 마크다운 요소 보호
-        protected_text = self.preservor.protect(text)
+        preservor = MarkdownPreserver()
+        protected_text = preservor.protect(text)
+
+        # 이 텍스트에 나온 용어만 골라 넣는다 (시스템 프롬프트는 그대로 두어 접두 캐시 유지)
+        terms = self.glossary.prompt_for(protected_text) if self.glossary else ""
 
         # 번역 프롬프트
-        user_prompt = f"""다음 영어 텍스트를 한국어로 번역하세요:
+        user_prompt = f"""{terms}다음 영어 텍스트를 한국어로 번역하세요:
 
 {protected_text}
 
 번역 결과:"""
 
+        cache_key = None
+        if self.cache:
+            cache_key = TranslationCache.make_key(
+                protected_text, self.model, self.SYSTEM_PROMPT + terms, self.GENERATE_OPTIONS)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return preservor.restore(cached)
+
+        # 중간 결과도 플레이스홀더를 되돌려 넘긴다 (다음 실행에서 그대로 재사용)
+        request_context = context
+        if context.on_progress:
+            request_context = RequestContext(
+                metrics=context.metrics, on_progress=lambda partial: context.on_progress(preservor.restore(partial)))
+
+        options = self.GENERATE_OPTIONS
+        failed_endpoints: List[Endpoint] = []
         for attempt in range(max_retries):
             try:
-                response = self.client.generate(
-                    model=self.model,
-                    prompt=user_prompt,
-                    system=self.SYSTEM_PROMPT,
-                    stream=False,
-                    options={
-                        "temperature": 0.3,
-                        "top_p": 0.9,
-                        "num_predict": 4096,
-                    }
-                )
+                response = self._generate(user_prompt, options, len(protected_text),
+                                          request_context, failed_endpoints)
+
+                if response.get("done_reason") == "length":
+                    raise TruncatedOutputError(
+                        f"출력이 {self.GENERATE_OPTIONS['num_predict']}토큰 한도에서 잘렸습니다")
+
+                for key in self.TELEMETRY_FIELDS:
+                    value = response.get(key)
+                    if value:
+                        context.metrics[key] = context.metrics.get(key, 0) + value
 
                 translated = response.get("response", "").strip()
 
+                if cache_key and translated:
+                    self.cache.put(cache_key, translated)
+
                 # 마크다운 요소 복원
-                restored = self.preservor.restore(translated)
+                restored = preservor.restore(translated)
 
                 return restored
 
+            except TruncatedOutputError:
+                raise
+
             except Exception as e:
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt
-                    print(f"\n재시도 {attempt + 1}/{max_retries} ({wait_time}초 대기)...")
+                if isinstance(e, RunawayOutputError):
+                    print(f"\n생성 중단: {e}")
+                    # 같은 반복에 다시 빠지지 않도록 반복 억제를 강화
+                    options = dict(self.GENERATE_OPTIONS, repeat_penalty=self.RETRY_REPEAT_PENALTY)
+
+                # 재시도가 몰려 서버를 더 밀어붙이지 않도록 예산 안에서만 재시도
+                if attempt < max_retries - 1 and self.controller.allow_retry():
+                    context.metrics["retries"] = context.metrics.get("retries", 0) + 1
+                    if failed_endpoints and self.pool.has_alternative(failed_endpoints):
+                        # 서버 쪽 실패는 기다리지 않고 다른 서버로 바로 재시도
+                        print(f"\n재시도 {attempt + 1}/{max_retries} "
+                              f"({failed_endpoints[-1].url} 실패, 다른 서버로)...")
+                        continue
+                    wait_time = self.controller.backoff(attempt)
+                    print(f"\n재시도 {attempt + 1}/{max_retries} ({wait_time:.1f}초 대기)...")
                     time.sleep(wait_time)
                 else:
                     raise e
 
         return ""
 
+    def warm_up(self) -> Dict[str, Optional[dict]]:
+        """모든 서버에 모델을 미리 올려 둠
+
+        시스템 프롬프트를 포함한 아주 작은 요청을 보내 모델 로드와 시스템 프롬프트
+        처리를 첫 페이지 전에 끝낸다. 서버별 응답 측정값을 돌려준다 (실패는 None).
+        """
+        endpoints = [e for e in self.pool.endpoints if not e.down]
+
+        def load(endpoint: Endpoint) -> Optional[dict]:
+            try:
+                return endpoint.client.generate(
+                    model=self.model,
+                    prompt=self.WARMUP_PROMPT,
+                    system=self.SYSTEM_PROMPT,
+                    stream=False,
+                    options={"num_predict": 1},
+                    keep_alive=self.keep_alive
+                )
+            except Exception as e:
+                print(f"모델 준비 실패: {endpoint.url} ({e})")
+                return None
+
+        if not endpoints:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+            return dict(zip((e.url for e in endpoints), executor.map(load, endpoints)))
+
+    def release(self):
+        """모델을 서버 메모리에서 내림 (keep_alive=0)"""
+        for endpoint in self.pool.endpoints:
+            if endpoint.down:
+                continue
+            try:
+                endpoint.client.generate(model=self.model, prompt="", keep_alive=0)
+            except Exception as e:
+                print(f"모델 해제 실패: {endpoint.url} ({e})")
+
+    def _generate(self, prompt: str, options: dict, source_length: int,
+                  context: RequestContext, failed_endpoints: List[Endpoint]) -> dict:
+        """서버를 골라 생성 요청 (서버 쪽 실패면 failed_endpoints에 추가)"""
+        endpoint = self.pool.acquire(exclude=failed_endpoints)
+        started = time.monotonic()
+        try:
+            if self.stream:
+                response = self._generate_stream(endpoint.client, prompt, options,
+                                                 source_length, context)
+            else:
+                response = endpoint.client.generate(
+                    model=self.model,
+                    prompt=prompt,
+                    system=self.SYSTEM_PROMPT,
+                    stream=False,
+                    options=options,
+                    keep_alive=self.keep_alive
+                )
+        except RunawayOutputError:
+            # 모델 출력 문제이지 서버 문제가 아님
+            self.pool.release(endpoint, ok=True)
+            raise
+        except Exception as e:
+            self.pool.release(endpoint, ok=False)
+            self.controller.on_error(e)
+            failed_endpoints.append(endpoint)
+            raise
+
+        self.pool.release(endpoint, ok=True)
+        self.controller.on_success(time.monotonic() - started, response.get("total_duration"))
+        return response
+
+    def _generate_stream(self, client, prompt: str, options: dict, source_length: int,
+                         context: RequestContext) -> dict:
+        """스트리밍 생성
+
+        토큰이 도착하는 대로 이어 붙이면서 반복 출력이나 원문 대비 과도한 길이가
+        보이면 전체 예산을 다 쓰기 전에 중단한다. 중간 결과는 주기적으로
+        context.on_progress에 넘긴다.
+        """
+        max_length = int(source_length * self.max_output_ratio) + 200
+        started = time.monotonic()
+        last_progress = started
+        text = ""
+        checked = 0
+        final = None
+
+        stream = client.generate(
+            model=self.model,
+            prompt=prompt,
+            system=self.SYSTEM_PROMPT,
+            stream=True,
+            options=options,
+            keep_alive=self.keep_alive
+        )
+        try:
+            for chunk in stream:
+                token = chunk.get("response", "")
+                if token:
+                    if not text and "ttft" not in context.metrics:
+                        # 나눠 보낸 조각이나 문단 재번역이 아닌 페이지의 첫 요청 기준
+                        context.metrics["ttft"] = time.monotonic() - started
+                    text += token
+
+                if chunk.get("done"):
+                    final = chunk
+                    break
+
+                if len(text) > max_length:
+                    raise RunawayOutputError(
+                        f"출력이 원문 길이의 {self.max_output_ratio}배를 넘었습니다 ({len(text)}자)")
+
+                if len(text) - checked >= self.REPEAT_CHECK_EVERY:
+                    checked = len(text)
+                    period = self._find_repetition(text)
+                    if period:
+                        raise RunawayOutputError(f"{period}자 단위 반복 출력 감지")
+
+                now = time.monotonic()
+                if context.on_progress and now - last_progress >= self.PROGRESS_INTERVAL:
+                    last_progress = now
+                    context.on_progress(text)
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+
+        response = {"response": text, "done_reason": None}
+        if final:
+            response["done_reason"] = final.get("done_reason")
+            for key in self.TELEMETRY_FIELDS:
+                response[key] = final.get(key)
+        return response
+
+    @classmethod
+    def _find_repetition(cls, text: str) -> Optional[int]:
+        """출력 끝부분이 같은 구간의 연속 반복이면 그 반복 단위 길이"""
+        for period in range(4, cls.REPEAT_MAX_PERIOD + 1):
+            span = max(cls.REPEAT_MIN_SPAN, period * 3)
+            if len(text) < span:
+                break
+            tail = text[-span:]
+            if tail[period:] == tail[:-period]:
+                return period
+        return None
+
 
 class BookTranslator:
     """책 번역 메인 클래스"""
@@ -272,52 +1819,101 @@ class BookTranslator:
                  input_file: str,
                  output_file: str,
                  state_file: str = "translation_state.json",
-                 model: str = "translategemma"):
+                 model: str = "translategemma",
+                 state_backend: str = "journal",
+                 cache_file: Optional[str] = None,
+                 cache_size_mb: int = 512,
+                 max_pages_per_request: int = 8,
+                 stream: bool = False,
+                 max_output_ratio: float = 3.0,
+                 host: Union[str, Sequence[str]] = "http://localhost:11434",
+                 lease_seconds: float = 120.0,
+                 keep_alive: Union[str, float] = "30m",
+                 warmup: bool = True,
+                 unload: bool = False,
+                 glossary_file: Optional[str] = None,
+                 draft_model: Optional[str] = None,
+                 preamble: bool = False):
         self.input_file = Path(input_file)
         self.output_file = Path(output_file)
-        self.state = TranslationState(state_file)
-        self.translator = OllamaTranslator(model=model)
+        self.state = TranslationState(state_file, backend=state_backend)
+        self.partial_dir = self.state.state_file.with_name(self.state.state_file.name + ".partial")
+        self.cache = TranslationCache(cache_file, cache_size_mb * 1024 * 1024) if cache_file else None
+        glossary = Glossary.load(glossary_file) if glossary_file else None
+        self.translator = OllamaTranslator(model=model, host=host, cache=self.cache,
+                                           stream=stream, max_output_ratio=max_output_ratio,
+                                           keep_alive=keep_alive, glossary=glossary)
+        # 단계별 번역: 작은 모델로 먼저 번역하고 검사에 걸린 페이지만 큰 모델로
+        self.draft_translator = None
+        if draft_model:
+            self.draft_translator = OllamaTranslator(
+                model=draft_model, cache=self.cache, stream=stream,
+                max_output_ratio=max_output_ratio, keep_alive=keep_alive, glossary=glossary,
+                pool=self.translator.pool, controller=self.translator.controller)
+        self.active = self.translator  # 지금 단계에서 쓰는 번역기
+        self.packer = RequestPacker(
+            max_output_tokens=OllamaTranslator.GENERATE_OPTIONS["num_predict"],
+            max_pages=max_pages_per_request
+        )
         self.model = model
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.source_changed = False
+        self.warmup = warmup
+        self.unload = unload  # 끝나면 keep_alive를 기다리지 않고 모델을 바로 내림
+        self.preamble = preamble  # 첫 ## Page 앞의 내용도 번역 (챕터 파일 입력)
 
     def initialize(self):
         """번역 초기화 - 페이지 분할"""
         print(f"파일 읽기: {self.input_file}")
-        with open(self.input_file, 'r', encoding='utf-8') as f:
-            text = f.read()
-
         print("페이지 분할 중...")
-        pages = PageSplitter.split(text)
+        # 같은 번호가 여러 번 나오면 split()처럼 마지막 것을 쓴다
+        pages = {ref[0]: ref for ref in PageSplitter.iter_pages(self.input_file, preamble=self.preamble)}
 
         print(f"총 {len(pages)}개 페이지 발견")
 
         # 상태 초기화
-        self.state.metadata["source_file"] = str(self.input_file)
-        self.state.metadata["total_pages"] = len(pages)
-        self.state.metadata["model"] = self.model
-        self.state.metadata["started_at"] = datetime.now().isoformat()
+        with self.state.locked():
+            existing = len(self.state.pages)
+            self.state.metadata["source_file"] = str(self.input_file)
+            self.state.metadata["total_pages"] = len(pages)
+            self.state.metadata["model"] = self.model
+            if not existing:
+                self.state.metadata["started_at"] = datetime.now().isoformat()
+
+            changed = [num for num, ref in pages.items() if self.state.add_page(*ref)]
 
-        for page_num, content in pages.items():
-            self.state.add_page(page_num, content)
+            if existing and changed:
+                reused = sum(len(self.state.pages[num].segments or {}) for num in changed)
+                print(f"원문이 바뀐 페이지 {len(changed)}개 (기존 번역 재사용 문단 {reused}개)")
 
-        self.state.save()
+            self.state.save()
         return len(pages)
 
-    def translate(self, resume: bool = True, limit: int = None, start_page: int = None):
+    def translate(self, resume: bool = True, limit: int = None, start_page: int = None,
+                  workers: int = 1):
         """번역 실행
 
         Args:
             resume: True면 이전 상태에서 계속
             limit: 번역할 최대 페이지 수 (None이면 전체)
             start_page: 시작 페이지 번호 (None이면 처음부터)
+            workers: 동시에 번역할 페이지 수 (1이면 순차 실행)
         """
-        # 재개 모드가 아니거나 상태가 없으면 초기화
-        if not resume or not self.state.pages:
+        # 재개 모드가 아니거나 상태가 없으면 초기화,
+        # 재개 모드라도 원문이 있으면 다시 읽어 바뀐 페이지를 찾는다
+        if not resume or not self.state.pages or self.input_file.exists():
             self.initialize()
 
-        pending = self.state.get_pending_pages()
+        with self.state.locked():
+            pending = self.state.get_pending_pages()
+            leased = self.state.get_leased_pages()
 
         if not pending:
-            print("모든 페이지가 이미 번역되었습니다!")
+            if leased:
+                print(f"남은 페이지 {len(leased)}개는 다른 작업자가 번역 중입니다.")
+            else:
+                print("모든 페이지가 이미 번역되었습니다!")
             return
 
         # 시작 페이지 필터링
@@ -330,47 +1926,585 @@ class BookTranslator:
 
         print(f"\n번역 시작: {len(pending)}개 페이지 대기 중")
         print(f"모델: {self.model}")
+        print(f"작업자: {self.worker_id}")
+        if self.translator.glossary:
+            print(f"용어집: {len(self.translator.glossary)}개 항목")
+        if leased:
+            print(f"다른 작업자가 번역 중인 페이지: {len(leased)}개")
+        controller = self.translator.controller
+        controller.reset(workers)
+        if workers > 1:
+            print(f"동시 작업 수: {controller.window}부터 시작, 최대 {workers} (서버 상태에 따라 조절)")
+        if len(self.translator.pool.endpoints) > 1:
+            self.translator.pool.check_all()
+        if self.partial_dir.exists():
+            self._reuse_partials()
         print(f"현재 완료율: {self.state.get_completion_rate():.1f}%\n")
 
         # 페이지 번호 순으로 정렬
         pending.sort()
 
-        with tqdm(total=len(pending), desc="번역 진행") as pbar:
-            for page_num in pending:
-                page = self.state.pages[page_num]
+        # 번역하는 동안 맡은 페이지의 임대를 주기적으로 연장
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(stop_heartbeat,),
+                                     name="heartbeat", daemon=True)
+        heartbeat.start()
+
+        try:
+            if not self.draft_translator:
+                self._run_pass(self.translator, pending, workers, "번역 진행")
+            else:
+                # 이전 실행에서 이미 큰 모델로 넘긴 페이지는 초벌 번역을 건너뛴다
+                drafts = [num for num in pending if not self.state.pages[num].draft_issues]
+                print(f"초벌 번역 모델: {self.draft_translator.model} ({len(drafts)}개 페이지)")
+                finished = self._run_pass(self.draft_translator, drafts, workers, "초벌 번역")
+                with self.state.locked():
+                    escalated = [num for num in pending
+                                 if self.state.pages[num].status == TranslationStatus.PENDING.value
+                                 and self.state.pages[num].draft_issues]
+                if finished and escalated:
+                    print(f"\n큰 모델로 다시 번역: {len(escalated)}개 페이지 ({self.model})")
+                    self._run_pass(self.translator, escalated, workers, "다시 번역")
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+            if self.unload:
+                self._release_model()
+
+        # 저널에 쌓인 변경 사항을 스냅샷으로 정리
+        with self.state.locked():
+            self.state.save()
 
-                try:
-                    self.state.update_page(page_num, status=TranslationStatus.IN_PROGRESS)
+        print(f"\n번역 완료율: {self.state.get_completion_rate():.1f}%")
+        flagged = [num for num in pending if self.state.pages[num].issues]
+        if flagged:
+            print(f"검증 문제가 남은 페이지 {len(flagged)}개: {', '.join(map(str, flagged[:20]))}"
+                  f"{' ...' if len(flagged) > 20 else ''} (--stats로 자세히 확인)")
+        if workers > 1 or controller.decreases:
+            print(controller.summary())
+        if self.cache:
+            print(self.cache.stats())
+        if len(self.translator.pool.endpoints) > 1:
+            print("서버별 요청:")
+            print(self.translator.pool.summary())
+        if self.draft_translator:
+            print(self._tier_summary(pending))
+
+    def _run_pass(self, translator: OllamaTranslator, pages: List[int], workers: int,
+                  desc: str) -> bool:
+        """한 모델로 페이지 목록 번역
+
+        Returns:
+            끝까지 진행했으면 True, Ctrl-C로 중단됐으면 False
+        """
+        self.active = translator
+        if not pages:
+            return True  # 초벌 번역이나 다시 번역할 페이지가 없으면 모델을 올리지 않는다
+
+        # 모델 로드는 요청을 묶는 동안 뒤에서 진행
+        warmup_results: Dict[str, Optional[dict]] = {}
+        warmup = None
+        if self.warmup:
+            warmup = threading.Thread(target=lambda: warmup_results.update(translator.warm_up()),
+                                      name="warmup", daemon=True)
+            warmup.start()
+
+        # 짧은 페이지는 묶고 긴 페이지는 번역 시 나눔
+        jobs = self.packer.pack(
+            (num, self._peek_content(num), self.state.pages[num].segments)
+            for num in pages
+        )
+        if len(jobs) < len(pages):
+            print(f"요청 묶음: {len(pages)}개 페이지 → {len(jobs)}개 요청\n")
+
+        if warmup:
+            started = time.monotonic()
+            warmup.join()
+            self._report_warmup(warmup_results, time.monotonic() - started)
+        tqdm = _import_tqdm()
+        with tqdm(total=len(pages), desc=desc) as pbar:
+            if workers > 1:
+                return self._translate_concurrent(jobs, workers, pbar)
+            return self._translate_sequential(jobs, pbar)
+
+    def _tier_summary(self, pages: List[int]) -> str:
+        """단계별 번역 결과 요약"""
+        tiers = {"draft": [0, 0.0], "full": [0, 0.0]}
+        escalated = 0
+        for num in pages:
+            page = self.state.pages[num]
+            if page.draft_issues:
+                escalated += 1
+                tiers["draft"][1] += page.draft_time or 0.0
+            if page.status == TranslationStatus.COMPLETED.value and page.tier in tiers:
+                tiers[page.tier][0] += 1
+                tiers[page.tier][1] += page.wall_time or 0.0
+        return (f"단계별 번역: 초벌 {tiers['draft'][0]}개 페이지 {tiers['draft'][1]:.1f}초, "
+                f"큰 모델 {tiers['full'][0]}개 페이지 {tiers['full'][1]:.1f}초 "
+                f"(큰 모델로 넘긴 페이지 {escalated}개)")
 
-                    # 번역 수행
-                    translated = self.translator.translate(page.content)
+    @staticmethod
+    def _report_warmup(results: Dict[str, Optional[dict]], waited: float):
+        """모델 준비 결과 출력"""
+        for url, response in results.items():
+            if response is None:
+                continue
+            load = (response.get("load_duration") or 0) / 1e9
+            total = (response.get("total_duration") or 0) / 1e9
+            if load >= 0.1:
+                print(f"모델 준비: {url} 로드 {load:.1f}초 (전체 {total:.1f}초)")
+            else:
+                print(f"모델 준비: {url} 이미 메모리에 있음 ({total:.1f}초)")
+        if waited >= 0.1:
+            print(f"모델 준비 대기: {waited:.1f}초")
+        print()
+
+    def _release_model(self):
+        """다른 작업자가 없으면 모델을 메모리에서 내림"""
+        with self.state.locked():
+            others = [num for num in self.state.get_leased_pages()
+                      if self.state.pages[num].lease_owner != self.worker_id]
+        if others:
+            return
+        self.translator.release()
+        if self.draft_translator:
+            self.draft_translator.release()
 
-                    self.state.update_page(
-                        page_num,
-                        translated=translated,
-                        status=TranslationStatus.COMPLETED
-                    )
+    def _translate_sequential(self, jobs: List[List[int]], pbar) -> bool:
+        """한 번에 한 요청씩 번역"""
+        for job in jobs:
+            size = len(job)
+
+            try:
+                snapshot = self._start_job(job)
+                if not snapshot:
+                    # 다른 작업자가 모두 가져감
+                    self._advance(pbar, size)
+                    continue
+
+                # 번역 수행
+                results, metrics, checks = self._translate_job(snapshot)
 
-                except KeyboardInterrupt:
-                    print("\n\n사용자에 의해 중단됨. 진행 상태가 저장되었습니다.")
+                self._commit_job(job, results, metrics, checks)
+
+            except KeyboardInterrupt:
+                print("\n\n사용자에 의해 중단됨. 진행 상태가 저장되었습니다.")
+                self._requeue(job)
+                return False
+
+            except Exception as e:
+                for page_num in job:
+                    self._record_failure(page_num, e)
+
+            self._advance(pbar, size)
+
+            # API 과부하 방지 (서버가 밀릴 때만 컨트롤러가 요청 간격을 둔다)
+            self.translator.controller.wait()
+        return True
+
+    def _translate_concurrent(self, jobs: List[List[int]], workers: int, pbar) -> bool:
+        """최대 workers개 요청을 동시에 번역
+
+        실제 동시 요청 수는 ConcurrencyController가 서버 상태를 보고 정한다.
+        상태 변경은 모두 메인 스레드에서 수행하고, 결과는 완료 순서와 관계없이
+        페이지 번호 순으로 커밋한다. Ctrl-C 시 진행 중인 페이지는 PENDING으로 되돌린다.
+        """
+        controller = self.translator.controller
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="translate")
+        sizes = [len(job) for job in jobs]  # 다른 작업자가 가져간 페이지도 진행 표시에 포함
+        queue = iter(range(len(jobs)))
+        next_commit = 0
+        in_flight: Dict[Future, int] = {}
+        finished: Dict[int, Future] = {}
+
+        def submit_next() -> bool:
+            index = next(queue, None)
+            if index is None:
+                return False
+            controller.wait()
+            snapshot = self._start_job(jobs[index])
+            if snapshot:
+                future = executor.submit(self._translate_job, snapshot)
+            else:
+                future = Future()
+                future.set_result(({}, {}, {}))
+            in_flight[future] = index
+            return True
+
+        try:
+            while len(in_flight) < controller.window and submit_next():
+                pass
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished[in_flight.pop(future)] = future
+
+                # 앞선 요청이 모두 끝난 구간까지만 순서대로 커밋
+                while next_commit in finished:
+                    self._commit_future(jobs[next_commit], finished.pop(next_commit))
+                    self._advance(pbar, sizes[next_commit])
+                    next_commit += 1
+
+                while len(in_flight) < controller.window and submit_next():
+                    pass
+
+        except KeyboardInterrupt:
+            print("\n\n사용자에 의해 중단됨. 진행 상태가 저장되었습니다.")
+            # 이미 끝난 결과는 버리지 않고 커밋
+            for index in sorted(finished):
+                self._commit_future(jobs[index], finished[index])
+            # 제출 도중 중단된 요청까지 포함해 진행 중인 페이지를 모두 대기열로 복귀
+            for job in jobs[next_commit:]:
+                self._requeue(job)
+            return False
+
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return True
+
+    def _start_job(self, job: List[int]) -> List[Tuple[int, str, Optional[Dict[str, str]]]]:
+        """요청에 속한 페이지를 임대하고 번역할 내용을 꺼냄
+
+        다른 작업자가 먼저 가져간 페이지는 job에서 빠진다. 실행 중에 원문이 바뀐
+        페이지는 대기 상태로 되돌리고 빼며, 다음 실행에서 원문을 다시 읽는다.
+        """
+        with self.state.locked():
+            snapshot = []
+            for page_num in self.state.claim(job, self.worker_id, self.lease_seconds):
+                try:
+                    content = self.state.page_content(page_num)
+                except ValueError as e:
+                    self.state.update_page(page_num, status=TranslationStatus.PENDING)
+                    if not self.source_changed:
+                        print(f"\n경고: {e}\n  바뀐 원문은 다시 실행하면 반영됩니다.")
+                    self.source_changed = True
+                    continue
+                snapshot.append((page_num, content, self.state.pages[page_num].segments))
+            job[:] = [page_num for page_num, _, _ in snapshot]
+            return snapshot
+
+    def _peek_content(self, page_num: int) -> str:
+        """요청을 묶을 때 쓸 페이지 원문 (바뀐 원문은 _start_job에서 걸러냄)"""
+        try:
+            return self.state.page_content(page_num)
+        except ValueError:
+            return ""
+
+    def _requeue(self, job: List[int]):
+        """이 작업자가 맡은 진행 중인 페이지를 대기 상태로 되돌림"""
+        with self.state.locked():
+            for page_num in job:
+                if self._owns(page_num):
                     self.state.update_page(page_num, status=TranslationStatus.PENDING)
-                    break
 
-                except Exception as e:
-                    print(f"\n페이지 {page_num} 번역 실패: {e}")
+    def _owns(self, page_num: int) -> bool:
+        """이 작업자가 임대 중인 페이지인지"""
+        page = self.state.pages[page_num]
+        return page.status == TranslationStatus.IN_PROGRESS.value and page.lease_owner == self.worker_id
+
+    def _heartbeat(self, stop: threading.Event):
+        """번역하는 동안 맡은 페이지의 임대를 연장 (별도 스레드)"""
+        while not stop.wait(self.lease_seconds / 3):
+            try:
+                with self.state.locked():
+                    self.state.renew_leases(self.worker_id, self.lease_seconds)
+            except OSError as e:
+                print(f"\n경고: 임대 연장 실패: {e}")
+
+    def _translate_job(self, job: List[Tuple[int, str, Optional[Dict[str, str]]]]
+                       ) -> Tuple[Dict[int, str], Dict[str, float], Dict[int, dict]]:
+        """요청 하나 번역 (여러 페이지를 묶은 요청은 구분자로 다시 나눔)
+
+        Returns:
+            (페이지별 번역, 요청 측정값, 페이지별 검증 결과)
+        """
+        started = time.monotonic()
+        context = RequestContext()
+        if self.translator.stream:
+            context.on_progress = lambda text: self._save_partial(job[0][0], text)
+
+        if len(job) == 1:
+            page_num, content, segments = job[0]
+            results = {page_num: self._translate_page(content, segments, context)}
+        else:
+            combined = RequestPacker.join_pages([(num, content) for num, content, _ in job])
+            results = RequestPacker.split_pages(
+                self._translate_text(combined, context), [num for num, _, _ in job])
+
+            if results is None:
+                # 모델이 페이지 구분자를 지키지 않았으면 페이지별로 다시 번역
+                results = {num: self._translate_page(content, None, self._page_context(context, num))
+                           for num, content, _ in job}
+
+        checks = {}
+        for page_num, content, _ in job:
+            results[page_num], checks[page_num] = self._validate(content, results[page_num], context)
+            # 완료 처리 때 원문 파일을 다시 읽지 않도록 번역한 원문의 문단 해시를 함께 넘긴다
+            checks[page_num]["paragraphs"] = PageSplitter.source_index(content)
+            if self.draft_translator:
+                tier = "draft" if self.active is self.draft_translator else "full"
+                checks[page_num]["tier"] = tier
+                if tier == "draft":
+                    # 초벌 번역은 고친 뒤에도 남은 문제나 품질 검사에 걸리면 큰 모델로 넘긴다
+                    problems = (checks[page_num]["issues"]
+                                + TranslationValidator.check_draft(content, results[page_num]))
+                    if problems:
+                        checks[page_num]["draft_issues"] = problems
+
+        context.metrics["wall_time"] = time.monotonic() - started
+        return results, context.metrics, checks
+
+    def _validate(self, content: str, translated: str, context: RequestContext) -> Tuple[str, dict]:
+        """번역 검증 후 문제가 있는 문단만 다시 번역
+
+        Returns:
+            (고친 번역, {"issues": 남은 문제, "repaired": 다시 번역해 고친 문단 수})
+        """
+        source = PageSplitter.paragraphs(content)
+        output = PageSplitter.paragraphs(translated)
+        pairs = TranslationValidator.pair(source, output)
+        if pairs is None:
+            # 어느 문단을 다시 보낼지 알 수 없으므로 기록만 한다
+            issues = [f"문단 대응 불가 (원문 {len(source)}개, 번역 {len(output)}개)"]
+            issues += TranslationValidator.check_paragraph(content, translated)
+            return translated, {"issues": issues, "repaired": 0}
+
+        issues = []
+        repaired = 0
+        result = []
+        # 재번역은 문단 하나뿐이므로 페이지의 부분 번역 파일에 쓰지 않는다 (측정값은 함께 모음)
+        repair_context = RequestContext(metrics=context.metrics)
+        for i, j in pairs:
+            if j is None and PageSplitter.RULE_PATTERN.fullmatch(source[i].strip()):
+                result.append(source[i])  # 빠뜨린 구분선은 원문 그대로
+                continue
+            paragraph = output[j] if j is not None else ""
+            problems = (TranslationValidator.check_paragraph(source[i], paragraph)
+                        if j is not None else ["번역에서 빠짐"])
+            if problems:
+                if not MarkdownPreserver.ENGINE.sub('', source[i]).strip():
+                    retry = source[i]  # 보존 요소만 있는 문단은 모델에 보낼 필요 없음
+                else:
+                    try:
+                        retry = self._translate_text(source[i], repair_context)
+                    except Exception:
+                        retry = None
+                if retry is not None and not TranslationValidator.check_paragraph(source[i], retry):
+                    paragraph = retry
+                    repaired += 1
+                else:
+                    issues.extend(f"문단 {i + 1}: {problem}" for problem in problems)
+            result.append(paragraph)
+
+        if repaired or len(result) != len(output):
+            translated = '\n\n'.join(p for p in result if p)
+        return translated, {"issues": issues, "repaired": repaired}
+
+    def _page_context(self, context: RequestContext, page_num: int) -> RequestContext:
+        """페이지 하나의 중간 결과를 그 페이지의 부분 번역 파일에 쓰는 문맥 (측정값은 함께 모음)"""
+        if not context.on_progress:
+            return context
+        return RequestContext(metrics=context.metrics,
+                              on_progress=lambda text: self._save_partial(page_num, text))
+
+    def _reuse_partials(self):
+        """이전 실행이 중단되며 남긴 부분 번역에서 끝까지 받은 문단을 재사용
+
+        부분 번역을 원문 문단과 앞에서부터 맞춰 보고, 검증을 통과한 문단까지만
+        segments에 넣는다. 다음 번역은 나머지 문단만 모델에 보낸다. 다른 작업자가
+        아직 번역 중인 페이지의 파일은 그대로 둔다.
+        """
+        files = sorted(self.partial_dir.glob("page_*.md"))
+        if not files:
+            return
+        reused = pages = 0
+        with self.state.locked():
+            leased = set(self.state.get_leased_pages())
+            pending = set(self.state.get_pending_pages())
+            for partial_file in files:
+                pieces = self._split_partial(int(partial_file.stem[len("page_"):]),
+                                             partial_file.read_text(encoding='utf-8'))
+                if any(num in leased for num, _, _ in pieces):
+                    continue
+                for num, text, complete in pieces:
+                    if num in pending:
+                        count = self._reuse_partial(num, text, complete)
+                        reused += count
+                        pages += bool(count)
+                partial_file.unlink()
+
+        print(f"이전 실행에서 중단된 부분 번역 {len(files)}개: 페이지 {pages}개에서 문단 {reused}개 재사용")
+
+    @staticmethod
+    def _split_partial(page_num: int, text: str) -> List[Tuple[int, str, bool]]:
+        """부분 번역 파일 내용을 (페이지 번호, 번역, 끝까지 받았는지)로 나눔
+
+        여러 페이지를 묶은 요청은 페이지 구분자로 나누며, 마지막 페이지만 잘렸을 수 있다.
+        """
+        markers = list(RequestPacker.PAGE_MARKER_PATTERN.finditer(text))
+        if not markers:
+            return [(page_num, text, False)]
+        pieces = []
+        for i, match in enumerate(markers):
+            last = i + 1 == len(markers)
+            end = len(text) if last else markers[i + 1].start()
+            pieces.append((int(match.group(1)), text[match.end():end], not last))
+        return pieces
+
+    def _reuse_partial(self, page_num: int, text: str, complete: bool) -> int:
+        """페이지 하나의 부분 번역을 segments로 옮기고 옮긴 문단 수를 돌려줌"""
+        try:
+            source = PageSplitter.paragraphs(self.state.page_content(page_num))
+        except ValueError:
+            return 0  # 원문이 바뀌었으면 맞춰 볼 수 없다
+        translated = PageSplitter.paragraphs(text)
+        if not complete:
+            translated = translated[:-1]  # 마지막 문단은 받다가 끊겼을 수 있다
+
+        segments = {}
+        for original, paragraph in zip(source, translated):
+            if TranslationValidator.check_paragraph(original, paragraph):
+                break  # 여기서 어긋났으면 뒤 문단도 맞춰 볼 수 없다
+            segments[_hash_text(original)] = paragraph
+        if not segments:
+            return 0
+        page = self.state.pages[page_num]
+        self.state.update_page(page_num, metrics={"segments": dict(page.segments or {}, **segments)})
+        return len(segments)
+
+    def _save_partial(self, page_num: int, text: str):
+        """스트리밍 중간 결과 저장 (작업 스레드에서 호출, 요청마다 다른 파일)"""
+        self.partial_dir.mkdir(exist_ok=True)
+        partial_file = self.partial_dir / f"page_{page_num:04d}.md"
+        tmp_file = partial_file.with_suffix(".tmp")
+        tmp_file.write_text(text, encoding='utf-8')
+        os.replace(tmp_file, partial_file)
+
+    def _translate_page(self, content: str, segments: Optional[Dict[str, str]],
+                        context: RequestContext) -> str:
+        """페이지 번역
+
+        원문 수정으로 다시 번역하는 페이지는 바뀐 문단만 모델에 보내고,
+        그대로인 문단은 기존 번역을 이어 붙인다.
+        """
+        if not segments:
+            return self._translate_text(content, context)
+
+        result = []
+        changed = []
+
+        def flush():
+            if changed:
+                result.append(self._translate_text('\n\n'.join(changed), self._progress_after(context, result)))
+                changed.clear()
+
+        for paragraph in PageSplitter.paragraphs(content):
+            reused = segments.get(_hash_text(paragraph))
+            if reused is None:
+                changed.append(paragraph)
+            else:
+                flush()
+                result.append(reused)
+        flush()
+
+        return '\n\n'.join(result)
+
+    def _translate_text(self, text: str, context: RequestContext) -> str:
+        """출력 한도에 맞게 나눠 번역 (출력이 잘리면 더 작게 나눠 재시도)"""
+        parts = []
+        for chunk in self.packer.split_text(text):
+            try:
+                parts.append(self.active.translate(chunk, context=self._progress_after(context, parts)))
+            except TruncatedOutputError:
+                halves = RequestPacker.halve(chunk)
+                if halves is None:
+                    raise
+                for half in halves:
+                    parts.append(self._translate_text(half, self._progress_after(context, parts)))
+        return '\n\n'.join(parts)
+
+    @staticmethod
+    def _progress_after(context: RequestContext, done: List[str]) -> RequestContext:
+        """앞서 번역을 마친 부분(done) 뒤에 이어 붙인 중간 결과를 넘기는 문맥
+
+        부분 번역 파일이 늘 페이지 처음부터의 번역을 담도록 한다.
+        """
+        if not context.on_progress or not done:
+            return context
+        return RequestContext(metrics=context.metrics,
+                              on_progress=lambda text: context.on_progress('\n\n'.join(done + [text])))
+
+    def _commit_future(self, job: List[int], future: Future):
+        """완료된 번역 작업 결과를 상태에 반영"""
+        try:
+            results, metrics, checks = future.result()
+        except Exception as e:
+            for page_num in job:
+                self._record_failure(page_num, e)
+            return
+
+        self._commit_job(job, results, metrics, checks)
+
+    def _commit_job(self, job: List[int], results: Dict[int, str], metrics: Dict[str, float],
+                    checks: Dict[int, dict]):
+        """요청에 속한 페이지들을 완료 처리"""
+        if not job:
+            return
+
+        # 묶은 요청의 토큰 수와 소요 시간은 페이지마다 똑같이 나눠 기록
+        shared = {
+            key: (value if key in ("ttft", "retries") else
+                  value / len(job) if isinstance(value, float) else value // len(job))
+            for key, value in metrics.items()
+        }
+        with self.state.locked():
+            for page_num in job:
+                # 임대가 만료된 사이 다른 작업자가 먼저 끝냈으면 그 결과를 둔다
+                if (not self._owns(page_num)
+                        and self.state.pages[page_num].status == TranslationStatus.COMPLETED.value):
+                    continue
+                check = dict(checks.get(page_num, {}))
+                paragraphs = check.pop("paragraphs", None)
+                if check.get("draft_issues"):
+                    # 큰 모델 단계에서 다시 번역하도록 대기열로 (초벌 번역에 쓴 시간은 기록)
                     self.state.update_page(
                         page_num,
-                        status=TranslationStatus.FAILED,
-                        error=str(e)
+                        status=TranslationStatus.PENDING,
+                        metrics={"draft_issues": check["draft_issues"],
+                                 "draft_time": shared.get("wall_time")}
                     )
+                    continue
+                self.state.update_page(
+                    page_num,
+                    translated=results[page_num],
+                    status=TranslationStatus.COMPLETED,
+                    metrics=dict(shared, **check),
+                    paragraphs=paragraphs
+                )
 
-                pbar.update(1)
-                pbar.set_postfix({"완료율": f"{self.state.get_completion_rate():.1f}%"})
-
-                # API 과부하 방지
-                time.sleep(0.5)
+        for page_num in job:
+            partial_file = self.partial_dir / f"page_{page_num:04d}.md"
+            if partial_file.exists():
+                partial_file.unlink()
+
+    def _record_failure(self, page_num: int, error: Exception):
+        """번역 실패 기록 (임대가 넘어간 페이지는 새 작업자에게 맡긴다)"""
+        print(f"\n페이지 {page_num} 번역 실패: {error}")
+        with self.state.locked():
+            if self._owns(page_num):
+                self.state.update_page(
+                    page_num,
+                    status=TranslationStatus.FAILED,
+                    error=str(error)
+                )
 
-        print(f"\n번역 완료율: {self.state.get_completion_rate():.1f}%")
+    def _advance(self, pbar, pages: int = 1):
+        """진행 표시줄 갱신"""
+        pbar.update(pages)
+        pbar.set_postfix({"완료율": f"{self.state.get_completion_rate():.1f}%",
+                          **self.translator.controller.describe()})
 
     def export(self, translated_only: bool = False):
         """번역 결과 내보내기
@@ -380,27 +2514,398 @@ class BookTranslator:
         """
         print(f"\n결과 내보내기: {self.output_file}")
 
-        # 페이지 번호 순으로 정렬하여 병합
-        sorted_pages = sorted(self.state.pages.items())
+        # 페이지 번호 순으로 이어 쓰기
+        tmp_file = self.output_file.with_name(self.output_file.name + ".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            separator = ""
+            for page in self.state.iter_pages():
+                if page.status == TranslationStatus.COMPLETED.value and page.translated:
+                    text = page.translated
+                elif not translated_only:
+                    # 번역 안 된 페이지는 원문 유지 (translated_only가 False일 때만)
+                    text = self.state.read_source(page)
+                else:
+                    continue
+                f.write(separator + text)
+                separator = '\n\n---\n\n'
+        os.replace(tmp_file, self.output_file)
 
-        result_parts = []
-        for page_num, page in sorted_pages:
-            if page.status == TranslationStatus.COMPLETED.value and page.translated:
-                result_parts.append(page.translated)
-            elif not translated_only:
-                # 번역 안 된 페이지는 원문 유지 (translated_only가 False일 때만)
-                result_parts.append(page.content)
+        print(f"저장 완료: {self.output_file}")
+        return self.output_file
 
-        result = '\n\n---\n\n'.join(result_parts)
+    def export_chapters(self, base_dir: Path, completed_only: bool = False):
+        """번역 결과를 book_ko.md 없이 바로 mdBook 챕터 파일로 내보내기
 
-        with open(self.output_file, 'w', encoding='utf-8') as f:
-            f.write(result)
+        페이지를 순서대로 흘려 보내며 챕터 경계에서 파일을 나눈다.
+        번역 안 된 페이지는 export()처럼 원문을 넣는다.
 
-        print(f"저장 완료: {self.output_file}")
-        return self.output_file
+        Args:
+            completed_only: True면 모든 페이지가 번역된 챕터만 내보내기
+        """
+        print(f"\n챕터 파일로 내보내기: {Path(base_dir) / 'src'}")
+        writer = ChapterWriter(base_dir, completed_only=completed_only)
 
+        for page in self.state.iter_pages():
+            if page.status == TranslationStatus.COMPLETED.value and page.translated:
+                writer.feed(page.translated)
+            else:
+                writer.feed(self.state.read_source(page), complete=False)
+
+        chapters = writer.close()
+        print(f"{len(chapters)}개 챕터 발견, 파일 {len(writer.written)}개 중 {len(writer.changed)}개 갱신")
+        if writer.search_updated:
+            print(f"검색 색인 갱신: 문서 {len(writer.search_updated)}개")
+        print_image_stats(writer.image_stats)
+        if writer.skipped:
+            print(f"번역이 끝나지 않아 건너뛴 챕터: {', '.join(map(str, sorted(writer.skipped)))}")
+        return writer.written
+
+
+class StatsReport:
+    """상태 파일에 기록된 요청 측정값 집계"""
+
+    def __init__(self, state: TranslationState, top: int = 10):
+        self.top = top
+        pages = list(state.pages.values())
+        measured = [p for p in pages if p.wall_time is not None]
+
+        def total(name: str) -> int:
+            return sum(getattr(p, name) or 0 for p in measured)
+
+        statuses: Dict[str, int] = {}
+        for page in pages:
+            statuses[page.status] = statuses.get(page.status, 0) + 1
+
+        eval_count = total("eval_count")
+        eval_seconds = total("eval_duration") / 1e9
+        prompt_count = total("prompt_eval_count")
+        prompt_seconds = total("prompt_eval_duration") / 1e9
+        wall_times = sorted(p.wall_time for p in measured)
+        retried = [p for p in measured if p.retries]
+        flagged = [p for p in pages if p.issues]
+        tiers: Dict[str, Dict[str, float]] = {}
+        for page in pages:
+            if page.draft_issues:
+                tier = tiers.setdefault("draft", {"pages": 0, "seconds": 0.0, "escalated": 0})
+                tier["escalated"] += 1
+                tier["seconds"] += page.draft_time or 0.0
+            if page.tier and page.status == TranslationStatus.COMPLETED.value:
+                tier = tiers.setdefault(page.tier, {"pages": 0, "seconds": 0.0, "escalated": 0})
+                tier["pages"] += 1
+                tier["seconds"] += page.wall_time or 0.0
+
+        self.data = {
+            "model": state.metadata.get("model", ""),
+            "pages": len(pages),
+            "pages_by_status": statuses,
+            "measured_pages": len(measured),
+            "prompt_eval_tokens": prompt_count,
+            "prompt_eval_seconds": prompt_seconds,
+            "prompt_tokens_per_second": prompt_count / prompt_seconds if prompt_seconds else 0.0,
+            "eval_tokens": eval_count,
+            "eval_seconds": eval_seconds,
+            "eval_tokens_per_second": eval_count / eval_seconds if eval_seconds else 0.0,
+            "load_seconds": total("load_duration") / 1e9,
+            "max_load_seconds": max((p.load_duration or 0 for p in measured), default=0) / 1e9,
+            "wall_seconds": sum(wall_times),
+            "wall_seconds_quantiles": {
+                str(q): wall_times[min(int(q * len(wall_times)), len(wall_times) - 1)] if wall_times else 0.0
+                for q in (0.5, 0.95, 0.99)
+            },
+            "retries": total("retries"),
+            "retried_pages": len(retried),
+            "retries_per_page": total("retries") / len(measured) if measured else 0.0,
+            "validated_pages": sum(1 for p in pages if p.issues is not None),
+            "repaired_paragraphs": sum(p.repaired or 0 for p in pages),
+            "flagged_pages": [{"page": p.page_num, "issues": p.issues} for p in flagged],
+            "tiers": tiers,
+            "slowest_pages": [
+                {"page": p.page_num, "wall_seconds": p.wall_time, "eval_tokens": p.eval_count or 0,
+                 "retries": p.retries or 0}
+                for p in sorted(measured, key=lambda p: p.wall_time, reverse=True)[:top]
+            ],
+        }
 
-def run_sample_test(model: str = "translategemma", pages: int = 3, start_page: int = None):
+    def format(self) -> str:
+        """터미널 출력용 요약"""
+        d = self.data
+        statuses = ", ".join(f"{k} {v}" for k, v in sorted(d["pages_by_status"].items()))
+        quantiles = d["wall_seconds_quantiles"]
+        lines = [
+            f"모델: {d['model']}",
+            f"페이지: {d['pages']}개 ({statuses}), 측정값 있는 페이지 {d['measured_pages']}개",
+            f"프롬프트 평가: {d['prompt_eval_tokens']}토큰, {d['prompt_tokens_per_second']:.1f} tokens/s",
+            f"생성: {d['eval_tokens']}토큰, {d['eval_seconds']:.1f}초, {d['eval_tokens_per_second']:.1f} tokens/s",
+            f"모델 로드: 합계 {d['load_seconds']:.1f}초, 최대 {d['max_load_seconds']:.1f}초",
+            f"페이지당 소요 시간: p50 {quantiles['0.5']:.2f}초, p95 {quantiles['0.95']:.2f}초, "
+            f"p99 {quantiles['0.99']:.2f}초 (합계 {d['wall_seconds']:.1f}초)",
+            f"재시도: {d['retries']}회, 재시도한 페이지 {d['retried_pages']}개, "
+            f"페이지당 {d['retries_per_page']:.2f}회",
+            f"검증: {d['validated_pages']}개 페이지, 다시 번역한 문단 {d['repaired_paragraphs']}개, "
+            f"문제가 남은 페이지 {len(d['flagged_pages'])}개",
+        ]
+        for p in d["flagged_pages"][:self.top]:
+            lines.append(f"  페이지 {p['page']:>4}: {'; '.join(p['issues'])}")
+        for name, tier in sorted(d["tiers"].items()):
+            line = f"단계 {name}: 완료 {tier['pages']}개 페이지, {tier['seconds']:.1f}초"
+            if tier["escalated"]:
+                line += f", 큰 모델로 넘김 {tier['escalated']}개"
+            lines.append(line)
+        if d["slowest_pages"]:
+            lines.append("가장 느린 페이지:")
+            for p in d["slowest_pages"]:
+                lines.append(f"  페이지 {p['page']:>4}: {p['wall_seconds']:.2f}초, "
+                             f"{p['eval_tokens']}토큰, 재시도 {p['retries']}회")
+        return "\n".join(lines)
+
+    def write_json(self, path: Path):
+        """JSON으로 저장"""
+        _write_atomic(path, json.dumps(self.data, ensure_ascii=False, indent=2))
+
+    def write_prometheus(self, path: Path):
+        """node_exporter textfile collector 형식으로 저장"""
+        d = self.data
+        model = d["model"].replace('\\', '\\\\').replace('"', '\\"')
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[Tuple[str, float]]):
+            lines.append(f"# HELP translator_{name} {help_text}")
+            lines.append(f"# TYPE translator_{name} {kind}")
+            for labels, value in samples:
+                label_text = f'model="{model}"' + (f",{labels}" if labels else "")
+                lines.append(f"translator_{name}{{{label_text}}} {value}")
+
+        metric("pages", "gauge", "Pages in the state file by status.",
+               [(f'status="{k}"', v) for k, v in sorted(d["pages_by_status"].items())])
+        metric("prompt_eval_tokens_total", "counter", "Prompt tokens evaluated.",
+               [("", d["prompt_eval_tokens"])])
+        metric("eval_tokens_total", "counter", "Tokens generated.", [("", d["eval_tokens"])])
+        metric("eval_seconds_total", "counter", "Time spent generating tokens.", [("", d["eval_seconds"])])
+        metric("eval_tokens_per_second", "gauge", "Generation throughput.",
+               [("", d["eval_tokens_per_second"])])
+        metric("load_seconds_total", "counter", "Time spent loading the model.", [("", d["load_seconds"])])
+        metric("page_wall_seconds", "summary", "Wall time per page.",
+               [(f'quantile="{q}"', v) for q, v in d["wall_seconds_quantiles"].items()])
+        lines.append(f'translator_page_wall_seconds_sum{{model="{model}"}} {d["wall_seconds"]}')
+        lines.append(f'translator_page_wall_seconds_count{{model="{model}"}} {d["measured_pages"]}')
+        metric("retries_total", "counter", "Request retries.", [("", d["retries"])])
+        metric("repaired_paragraphs_total", "counter", "Paragraphs re-translated after failing validation.",
+               [("", d["repaired_paragraphs"])])
+        metric("flagged_pages", "gauge", "Pages with unresolved validation issues.",
+               [("", len(d["flagged_pages"]))])
+        if d["tiers"]:
+            metric("tier_pages", "gauge", "Completed pages by translation tier.",
+                   [(f'tier="{k}"', v["pages"]) for k, v in sorted(d["tiers"].items())])
+            metric("tier_seconds_total", "counter", "Wall time spent per translation tier.",
+                   [(f'tier="{k}"', v["seconds"]) for k, v in sorted(d["tiers"].items())])
+            metric("escalated_pages", "gauge", "Draft pages escalated to the large model.",
+                   [("", d["tiers"].get("draft", {}).get("escalated", 0))])
+
+        _write_atomic(path, "\n".join(lines) + "\n")
+
+
+class StageProfiler:
+    """--profile: 파이프라인 단계별 소요 시간 측정
+
+    start()가 STAGES의 메서드를 시간을 재는 래퍼로 바꿔 끼우고 stop()이 되돌린다.
+    켜지 않으면 원래 메서드가 그대로 불리므로 비용이 없다. 여러 스레드에서 동시에
+    불리는 단계는 합계가 전체 시간보다 클 수 있고(점유율 100% 초과), 할당량은
+    tracemalloc 최고치를 단계 호출마다 다시 재는 대략값이다.
+    """
+
+    # (단계 이름, 클래스, 메서드) - tqdm은 start()에서 불러와 붙인다
+    STAGES = [
+        ("split", PageSplitter, "iter_pages"),
+        ("split", PageSplitter, "split"),
+        ("protect", MarkdownPreserver, "protect"),
+        ("restore", MarkdownPreserver, "restore"),
+        ("glossary", Glossary, "prompt_for"),
+        ("cache", TranslationCache, "get"),
+        ("cache", TranslationCache, "put"),
+        ("ollama", OllamaTranslator, "_generate"),
+        ("validate", BookTranslator, "_validate"),
+        ("state.refresh", TranslationState, "refresh"),
+        ("state.save", TranslationState, "save"),
+        ("state.journal", JournalStateBackend, "record"),
+        ("export", BookTranslator, "export"),
+        ("export", BookTranslator, "export_chapters"),
+    ]
+
+    # Python 3.12부터 cProfile은 sys.monitoring을 써서 프로세스에 하나만 켤 수 있다
+    # (둘째 enable()은 "Another profiling tool is already active"). 그때는 start()에서 켠
+    # 프로파일 하나가 모든 스레드를 잰다.
+    PER_THREAD_CPROFILE = sys.version_info < (3, 12)
+
+    def __init__(self, memory: bool = False, cprofile_file: Optional[Path] = None):
+        self.memory = memory
+        self.cprofile_file = cprofile_file
+        self.samples: Dict[str, List[float]] = {}
+        self.peaks: Dict[str, int] = {}
+        self._patched: List[Tuple[type, str, object]] = []
+        self._profiles: list = []
+        self._started = 0.0
+        self.wall = 0.0
+
+    def start(self):
+        stages = list(self.STAGES)
+        stages += [("tqdm", _import_tqdm(), name) for name in ("update", "set_postfix")]
+        for stage, owner, name in stages:
+            original = vars(owner)[name]
+            self.samples.setdefault(stage, [])
+            self.peaks.setdefault(stage, 0)
+            wrapped = self._wrap(stage, original.__func__ if isinstance(original, staticmethod) else original)
+            setattr(owner, name, staticmethod(wrapped) if isinstance(original, staticmethod) else wrapped)
+            self._patched.append((owner, name, original))
+
+        if self.memory:
+            tracemalloc.start()
+        if self.cprofile_file:
+            if self.PER_THREAD_CPROFILE:
+                # cProfile은 스레드마다 따로 켜야 하므로 새 스레드가 처음 불릴 때 붙인다
+                threading.setprofile(self._profile_thread)
+            self._profile_thread()
+        self._started = time.perf_counter()
+
+    def stop(self):
+        self.wall = time.perf_counter() - self._started
+        if self.cprofile_file:
+            if self.PER_THREAD_CPROFILE:
+                threading.setprofile(None)
+            for profile in self._profiles:
+                profile.disable()
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched = []
+
+    def _profile_thread(self, *args):
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return  # 다른 프로파일러가 이미 켜져 있음 (이 스레드는 재지 않음)
+        self._profiles.append(profile)
+
+    def _wrap(self, stage: str, func: Callable) -> Callable:
+        samples = self.samples[stage]
+
+        if inspect.isgeneratorfunction(func):
+            # 제너레이터는 값을 하나씩 만들어 내는 동안의 시간만 더한다
+            @functools.wraps(func)
+            def generator(*args, **kwargs):
+                elapsed = 0.0
+                started = time.perf_counter()
+                try:
+                    for item in func(*args, **kwargs):
+                        elapsed += time.perf_counter() - started
+                        yield item
+                        started = time.perf_counter()
+                    elapsed += time.perf_counter() - started
+                finally:
+                    samples.append(elapsed)
+            return generator
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            base = 0
+            if self.memory:
+                base = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - started)
+                if self.memory:
+                    self.peaks[stage] = max(self.peaks[stage], tracemalloc.get_traced_memory()[1] - base)
+        return timed
+
+    def report(self, top: int = 10):
+        """단계별 합계, 평균, p95, 전체 시간 대비 점유율, 최대 할당 출력"""
+        print("\n" + "=" * 60)
+        print(f"단계별 시간 (전체 {self.wall:.2f}초)")
+        print("=" * 60)
+        columns = [("단계", -14), ("호출", 8), ("합계(초)", 10), ("평균(ms)", 10), ("p95(ms)", 10), ("점유율", 8)]
+        if self.memory:
+            columns.append(("최대 할당", 11))
+        print("".join(_pad(title, width) for title, width in columns))
+        rows = sorted(((stage, sorted(times)) for stage, times in self.samples.items() if times),
+                      key=lambda row: sum(row[1]), reverse=True)
+        if not rows:
+            print("(측정된 단계 없음)")
+        for stage, times in rows:
+            total = sum(times)
+            p95 = times[min(int(0.95 * len(times)), len(times) - 1)]
+            share = total / self.wall * 100 if self.wall else 0.0
+            line = (f"{stage:<14}{len(times):>8}{total:>10.3f}{total / len(times) * 1000:>10.2f}"
+                    f"{p95 * 1000:>10.2f}{share:>7.1f}%")
+            if self.memory:
+                line += f"{self.peaks[stage] / 1024 / 1024:>9.1f}MB"
+            print(line)
+
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            print(f"\n메모리: 현재 {current / 1024 / 1024:.1f}MB, 최고 {peak / 1024 / 1024:.1f}MB")
+            print(f"할당이 많은 위치 (상위 {top}개):")
+            for stat in tracemalloc.take_snapshot().statistics("lineno")[:top]:
+                print(f"  {stat.size / 1024:>9.0f}KB  {stat.count:>7}회  {stat.traceback[0]}")
+            tracemalloc.stop()
+
+        if self.cprofile_file and not self._profiles:
+            print("\ncProfile: 다른 프로파일러가 이미 켜져 있어 저장하지 않았습니다")
+        elif self.cprofile_file:
+            stats = pstats.Stats(*self._profiles)
+            stats.dump_stats(str(self.cprofile_file))
+            print(f"\ncProfile 저장: {self.cprofile_file} (python -m pstats {self.cprofile_file})")
+
+
+def _pad(text: str, width: int) -> str:
+    """터미널 표시 너비(한글은 두 칸) 기준으로 맞춤 (width가 음수면 왼쪽 정렬)"""
+    fill = " " * max(0, abs(width) - sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text))
+    return text + fill if width < 0 else fill + text
+
+
+def _write_atomic(path: Path, text: str):
+    """임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓴 파일을 보지 않도록)"""
+    tmp_file = path.with_name(path.name + ".tmp")
+    tmp_file.write_text(text, encoding='utf-8')
+    os.replace(tmp_file, path)
+
+
+def report_stats(state: TranslationState, json_file: Optional[Path] = None,
+                 prom_file: Optional[Path] = None, show: bool = True):
+    """측정값 요약 출력 및 파일 저장"""
+    report = StatsReport(state)
+    if show:
+        print("\n" + "=" * 60)
+        print("번역 통계")
+        print("=" * 60)
+        print(report.format())
+    if json_file:
+        report.write_json(json_file)
+        print(f"통계 저장: {json_file}")
+    if prom_file:
+        report.write_prometheus(prom_file)
+        print(f"통계 저장: {prom_file}")
+
+
+def keep_alive_value(value: str) -> Union[str, int]:
+    """--keep-alive 값 변환 (숫자만 있으면 초 단위 정수로)"""
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def run_sample_test(model: str = "translategemma", pages: int = 3, start_page: int = None,
+                    workers: int = 1, state_backend: str = "journal",
+                    cache_file: Optional[str] = None, cache_size_mb: int = 512,
+                    max_pages_per_request: int = 8, stream: bool = False,
+                    max_output_ratio: float = 3.0,
+                    host: Union[str, Sequence[str]] = "http://localhost:11434",
+                    keep_alive: Union[str, float] = "30m", warmup: bool = True,
+                    unload: bool = False, glossary_file: Optional[str] = None,
+                    draft_model: Optional[str] = None):
     """샘플 테스트 실행 - 특정 페이지 범위만 번역"""
     print("=" * 60)
     print("샘플 번역 테스트")
@@ -412,8 +2917,9 @@ def run_sample_test(model: str = "translategemma", pages: int = 3, start_page: i
     state_file = base_dir / "sample_state.json"
 
     # 기존 샘플 상태 파일 삭제 (항상 새로 시작)
-    if state_file.exists():
-        state_file.unlink()
+    for path in (state_file, state_file.with_name(state_file.name + ".journal")):
+        if path.exists():
+            path.unlink()
 
     print(f"\n입력 파일: {input_file}")
     print(f"출력 파일: {output_file}")
@@ -427,11 +2933,23 @@ def run_sample_test(model: str = "translategemma", pages: int = 3, start_page: i
         input_file=str(input_file),
         output_file=str(output_file),
         state_file=str(state_file),
-        model=model
+        model=model,
+        state_backend=state_backend,
+        cache_file=cache_file,
+        cache_size_mb=cache_size_mb,
+        max_pages_per_request=max_pages_per_request,
+        stream=stream,
+        max_output_ratio=max_output_ratio,
+        host=host,
+        keep_alive=keep_alive,
+        warmup=warmup,
+        unload=unload,
+        glossary_file=glossary_file,
+        draft_model=draft_model
     )
 
     # 페이지 수 제한하여 번역
-    translator.translate(resume=False, limit=pages, start_page=start_page)
+    translator.translate(resume=False, limit=pages, start_page=start_page, workers=workers)
     translator.export(translated_only=True)  # 샘플 테스트에서는 번역된 것만 출력
 
     # 결과 미리보기
@@ -455,43 +2973,418 @@ def run_sample_test(model: str = "translategemma", pages: int = 3, start_page: i
     print("=" * 60)
 
 
+def show_status(state_file: Path):
+    """번역 진행 상황 출력 (모델 서버나 원문 없이 상태 색인만 읽는다)"""
+    if not state_file.exists():
+        print(f"상태 파일이 없습니다: {state_file}")
+        return
+
+    started = time.perf_counter()
+    summary = TranslationState(str(state_file)).summary()
+    elapsed = time.perf_counter() - started
+
+    metadata = summary["metadata"]
+    counts = summary["counts"]
+    completed = counts.get(TranslationStatus.COMPLETED.value, 0)
+    rate = completed / summary["pages"] * 100 if summary["pages"] else 0.0
+    print(f"상태 파일: {state_file}")
+    print(f"원문: {metadata.get('source_file', '')}  모델: {metadata.get('model', '')}")
+    print(f"페이지: {summary['pages']}개, 완료 {completed}개 ({rate:.1f}%)")
+    print("  " + ", ".join(f"{status} {count}" for status, count in sorted(counts.items())))
+    now = time.time()
+    for owner, (pages, expires) in sorted(summary["workers"].items()):
+        print(f"  번역 중: {owner} {pages}개 페이지 (임대 만료까지 {expires - now:.0f}초)")
+    if summary["flagged"]:
+        print(f"검증 문제가 남은 페이지: {summary['flagged']}개")
+    print(f"마지막 갱신: {metadata.get('last_updated', '')}")
+    print(f"({'색인' if summary['indexed'] else '전체 상태 파일'}에서 {elapsed * 1000:.0f}ms)")
+
+
+CHAPTER_FILE_PATTERN = re.compile(r'chapter(\d+)\.md')
+TITLE_PATTERN = re.compile(r'^#\s+(.+?)\s*$', re.MULTILINE)
+CHAPTER_LABEL_PATTERN = re.compile(r'\s*#\s+(?:챕터|chapter)\s*\d+[ \t]*(?:\n|$)', re.IGNORECASE)
+
+
+def find_chapter_files(chapter_dir: Path) -> Dict[int, Path]:
+    """챕터 디렉터리의 chapterN.md 파일 (chapter_groups.md 같은 다른 파일은 제외)"""
+    files = {}
+    for path in chapter_dir.iterdir():
+        match = CHAPTER_FILE_PATTERN.fullmatch(path.name)
+        if match:
+            files[int(match.group(1))] = path
+    return dict(sorted(files.items()))
+
+
+def chapter_heading(num: int, text: str) -> Tuple[str, str]:
+    """챕터 첫 페이지에서 제목을 정하고 본문 앞의 "# 챕터 N" 표시 줄을 뺌
+
+    CHAPTERS에 없는 챕터는 표시 줄 다음 헤딩을 제목으로 쓰고, 제목 줄이 두 번
+    나오지 않도록 그 헤딩도 본문에서 뺀다.
+
+    Returns:
+        (제목, 본문)
+    """
+    label = CHAPTER_LABEL_PATTERN.match(text)
+    if label:
+        text = text[label.end():].lstrip()
+    if num in CHAPTER_BY_NUM:
+        return CHAPTER_BY_NUM[num][1], text
+
+    match = TITLE_PATTERN.match(text)
+    if match:
+        return match.group(1), text[match.end():].lstrip()
+    match = TITLE_PATTERN.search(text)
+    return (match.group(1) if match else f"Chapter {num}"), text
+
+
+def schedule_chapters(sizes: Dict[int, int], processes: int) -> Tuple[List[int], List[int]]:
+    """긴 챕터부터 넣는 순서와, 그 순서로 돌렸을 때 프로세스별 예상 분량
+
+    프로세스 풀은 먼저 빈 프로세스에 다음 챕터를 주므로 긴 챕터를 먼저 넣으면
+    마지막에 긴 챕터 하나만 남아 나머지 프로세스가 노는 일이 줄어든다 (LPT 스케줄링).
+    """
+    order = sorted(sizes, key=lambda num: (-sizes[num], num))
+    loads = [0] * max(1, min(processes, len(order)))
+    for num in order:
+        loads[loads.index(min(loads))] += sizes[num]
+    return order, loads
+
+
+def _translate_chapter(chapter_num: int, options: dict, translate_options: dict,
+                       log_file: str) -> dict:
+    """프로세스 풀에서 챕터 하나 번역 (출력은 챕터별 로그 파일로)"""
+    started = time.monotonic()
+    with open(log_file, 'a', encoding='utf-8') as log, redirect_stdout(log), redirect_stderr(log):
+        translator = BookTranslator(**options)
+        translator.translate(**translate_options)
+        summary = translator.state.summary()
+    return {
+        "chapter": chapter_num,
+        "pages": summary["pages"],
+        "completed": summary["counts"].get(TranslationStatus.COMPLETED.value, 0),
+        "flagged": summary["flagged"],
+        "seconds": time.monotonic() - started,
+    }
+
+
+class ChapterDirTranslator:
+    """챕터 디렉터리(translate/chapterN.md) 일괄 번역
+
+    챕터 파일마다 상태 파일을 따로 두고 독립된 작업으로 번역한다. 작업은 프로세스
+    풀에서 긴 챕터부터 돌리고, 끝나면 결과를 src/chapters와 SUMMARY.md로 합친다.
+    """
+
+    def __init__(self, chapter_dir: Path, state_dir: Path, base_dir: Path, options: dict,
+                 processes: int = 4):
+        self.chapter_dir = Path(chapter_dir)
+        self.state_dir = Path(state_dir)
+        self.base_dir = Path(base_dir)
+        self.options = options
+        self.processes = processes
+        self.files = find_chapter_files(self.chapter_dir)
+
+    def state_file(self, path: Path) -> Path:
+        return self.state_dir / f"{path.stem}.json"
+
+    def translate(self, resume: bool = True, limit: int = None, workers: int = 1) -> bool:
+        """모든 챕터 번역 (중단되면 False)"""
+        if not self.files:
+            print(f"챕터 파일이 없습니다: {self.chapter_dir}")
+            return True
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+
+        sizes = {num: path.stat().st_size for num, path in self.files.items()}
+        order, loads = schedule_chapters(sizes, self.processes)
+        total = sum(sizes.values())
+        print(f"챕터 {len(order)}개, 전체 {total / 1024:.0f}KB")
+        print(f"프로세스 {len(loads)}개 x 동시 작업 최대 {workers}개, 긴 챕터부터: "
+              + ", ".join(map(str, order)))
+        print(f"프로세스별 예상 분량 최대 {max(loads) / 1024:.0f}KB "
+              f"(균등 분배 시 {total / len(loads) / 1024:.0f}KB)")
+        print(f"챕터별 로그: {self.state_dir}/chapterN.log\n")
+
+        # 모델은 여기서 한 번만 올리고, 작업 프로세스는 올리거나 내리지 않는다
+        first_model = self.options.get("draft_model") or self.options["model"]
+        loader = OllamaTranslator(model=first_model, host=self.options["host"],
+                                  keep_alive=self.options["keep_alive"])
+        if self.options.get("warmup", True):
+            started = time.monotonic()
+            BookTranslator._report_warmup(loader.warm_up(), time.monotonic() - started)
+
+        job_options = dict(self.options, warmup=False, unload=False, preamble=True)
+        translate_options = {"resume": resume, "limit": limit, "workers": workers}
+        interrupted = False
+        executor = ProcessPoolExecutor(max_workers=len(loads))
+        try:
+            futures = {}
+            for num in order:
+                path = self.files[num]
+                state_file = self.state_file(path)
+                options = dict(job_options, input_file=str(path), state_file=str(state_file),
+                               output_file=str(state_file.with_suffix(".md")))
+                log_file = str(state_file.with_suffix(".log"))
+                futures[executor.submit(_translate_chapter, num, options, translate_options,
+                                        log_file)] = num
+
+            for done, future in enumerate(as_completed(futures), 1):
+                num = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"[{done}/{len(futures)}] 챕터 {num} 실패: {e} "
+                          f"(로그: {self.state_file(self.files[num]).with_suffix('.log')})")
+                    continue
+                line = (f"[{done}/{len(futures)}] 챕터 {num}: {result['completed']}/{result['pages']} "
+                        f"페이지 완료 ({result['seconds']:.1f}초)")
+                if result["flagged"]:
+                    line += f", 검증 문제 {result['flagged']}개"
+                print(line)
+        except KeyboardInterrupt:
+            interrupted = True
+            print("\n중단 요청: 진행 중인 챕터의 상태를 저장하는 중...")
+            executor.shutdown(wait=True, cancel_futures=True)
+        finally:
+            executor.shutdown(wait=True)
+
+        if self.options.get("unload"):
+            loader.release()
+            if self.options.get("draft_model"):
+                OllamaTranslator(model=self.options["model"], host=self.options["host"]).release()
+        return not interrupted
+
+    def merge(self, completed_only: bool = False) -> List[Path]:
+        """챕터별 번역 결과를 mdBook src/ 구조로 합침
+
+        번역 안 된 페이지는 원문을 넣고, 아직 시작하지 않은 챕터는 원문 파일을 그대로 쓴다.
+        introduction.md는 건드리지 않는다.
+        """
+        print(f"\n챕터 파일로 합치기: {self.base_dir / 'src'}")
+        writer = ChapterWriter(self.base_dir, completed_only=completed_only, introduction=False)
+
+        for num, path in self.files.items():
+            state_file = self.state_file(path)
+            if state_file.exists():
+                state = TranslationState(str(state_file), backend=self.options["state_backend"])
+                pages = [
+                    (page.translated, True)
+                    if page.status == TranslationStatus.COMPLETED.value and page.translated
+                    else (state.read_source(page), False)
+                    for page in state.iter_pages()
+                ]
+            else:
+                pages = [(path.read_text(encoding='utf-8'), False)]
+
+            if pages:
+                title, first = chapter_heading(num, pages[0][0])
+                pages[0] = (first, pages[0][1])
+            else:
+                title = CHAPTER_BY_NUM[num][1] if num in CHAPTER_BY_NUM else f"Chapter {num}"
+            writer.add_chapter(num, title, pages)
+
+        writer.close()
+        print(f"챕터 {len(self.files)}개, 파일 {len(writer.written)}개 중 {len(writer.changed)}개 갱신")
+        if writer.search_updated:
+            print(f"검색 색인 갱신: 문서 {len(writer.search_updated)}개")
+        print_image_stats(writer.image_stats)
+        if writer.skipped:
+            print(f"번역이 끝나지 않아 건너뛴 챕터: {', '.join(map(str, sorted(writer.skipped)))}")
+        return writer.written
+
+    def show_status(self):
+        """챕터별 진행 상황 출력 (상태 색인만 읽음)"""
+        total = completed = 0
+        for num, path in self.files.items():
+            state_file = self.state_file(path)
+            if not state_file.exists():
+                print(f"챕터 {num:>2}: 시작 전")
+                continue
+            summary = TranslationState(str(state_file), backend=self.options["state_backend"]).summary()
+            done = summary["counts"].get(TranslationStatus.COMPLETED.value, 0)
+            total += summary["pages"]
+            completed += done
+            line = f"챕터 {num:>2}: {done}/{summary['pages']} 페이지"
+            if summary["flagged"]:
+                line += f", 검증 문제 {summary['flagged']}개"
+            print(line)
+        rate = completed / total * 100 if total else 0.0
+        print(f"전체: {completed}/{total} 페이지 ({rate:.1f}%)")
+
+
+def export_results(translator: BookTranslator, base_dir: Path, args):
+    """옵션에 따라 book_ko.md 또는 챕터 파일로 내보내기"""
+    if args.chapters or args.completed_chapters:
+        translator.export_chapters(base_dir, completed_only=args.completed_chapters)
+    else:
+        translator.export()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Ollama 기반 마크다운 번역기")
     parser.add_argument("--input", "-i", default="book.md", help="입력 파일")
     parser.add_argument("--output", "-o", default="book_ko.md", help="출력 파일")
     parser.add_argument("--state", "-s", default="translation_state.json", help="상태 파일")
     parser.add_argument("--model", "-m", default="translategemma", help="Ollama 모델")
+    parser.add_argument("--draft-model", metavar="MODEL",
+                        help="단계별 번역: 이 작은 모델로 먼저 번역하고 품질 검사에 걸린 페이지만 "
+                             "--model로 다시 번역")
+    parser.add_argument("--host", action="append", metavar="URL",
+                        help="Ollama 서버 주소 (여러 번 지정하거나 쉼표로 구분, 기본: http://localhost:11434)")
     parser.add_argument("--no-resume", action="store_true", help="처음부터 다시 번역")
+    parser.add_argument("--lease", type=float, default=120.0, metavar="SEC",
+                        help="페이지 임대 시간(초). 같은 상태 파일로 여러 프로세스를 띄우면 "
+                             "임대한 페이지를 나눠 번역하고, 만료된 페이지는 다른 작업자가 가져감 (기본: 120)")
+    parser.add_argument("--chapter-dir", metavar="DIR",
+                        help="챕터 디렉터리 입력 (예: translate): chapterN.md마다 상태 파일을 따로 두고 "
+                             "여러 프로세스로 나눠 번역한 뒤 src/chapters로 합침")
+    parser.add_argument("--jobs", "-j", type=int, default=4, metavar="N",
+                        help="--chapter-dir에서 동시에 번역할 챕터 수 (프로세스 수, 기본: 4)")
     parser.add_argument("--export-only", action="store_true", help="번역 결과만 내보내기")
+    parser.add_argument("--chapters", action="store_true",
+                        help="book_ko.md 대신 src/chapters에 챕터 파일로 바로 내보내기")
+    parser.add_argument("--completed-chapters", action="store_true",
+                        help="번역이 끝난 챕터만 내보내기 (--chapters 포함)")
     parser.add_argument("--sample", type=int, metavar="N", help="샘플 테스트 모드: N페이지만 번역")
     parser.add_argument("--start", type=int, metavar="N", help="시작 페이지 번호 (--sample과 함께 사용)")
     parser.add_argument("--limit", type=int, metavar="N", help="번역할 최대 페이지 수")
+    parser.add_argument("--workers", "-w", type=int, default=1, metavar="N",
+                        help="동시에 번역할 페이지 수 (기본: 1)")
+    parser.add_argument("--state-backend", choices=sorted(STATE_BACKENDS), default="journal",
+                        help="상태 저장 방식: journal(변경분만 추가 기록) 또는 json(매번 전체 저장)")
+    parser.add_argument("--cache", default="translation_cache.db", help="번역 캐시 파일")
+    parser.add_argument("--cache-size", type=int, default=512, metavar="MB",
+                        help="번역 캐시 최대 크기 (MB, 기본: 512)")
+    parser.add_argument("--no-cache", action="store_true", help="번역 캐시 사용 안 함")
+    parser.add_argument("--pack", type=int, default=8, metavar="N",
+                        help="짧은 페이지를 한 요청에 묶을 최대 개수 (1이면 묶지 않음, 기본: 8)")
+    parser.add_argument("--keep-alive", type=keep_alive_value, default="30m", metavar="DURATION",
+                        help="마지막 요청 뒤 모델을 메모리에 유지할 시간 (예: 30m, 3600, -1은 무기한, 기본: 30m)")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="시작할 때 모델을 미리 올리지 않음")
+    parser.add_argument("--unload", action="store_true",
+                        help="끝난 뒤 모델을 바로 내림 (기본: --keep-alive 동안 유지해 다음 실행이 바로 시작)")
+    parser.add_argument("--glossary", default="glossary.json",
+                        help="용어집 파일 (페이지에 나온 용어만 프롬프트에 넣음, 기본: glossary.json)")
+    parser.add_argument("--no-glossary", action="store_true", help="용어집 사용 안 함")
+    parser.add_argument("--stream", action="store_true",
+                        help="스트리밍 생성: 반복 출력/과도한 길이를 조기에 감지해 재시도")
+    parser.add_argument("--max-output-ratio", type=float, default=3.0, metavar="R",
+                        help="스트리밍 중 원문 대비 허용할 최대 출력 길이 배율 (기본: 3.0)")
+    parser.add_argument("--stats", action="store_true", help="번역 통계만 출력 (번역하지 않음)")
+    parser.add_argument("--stats-json", metavar="FILE", help="번역 통계를 JSON으로 저장")
+    parser.add_argument("--stats-prom", metavar="FILE", help="번역 통계를 Prometheus textfile로 저장")
+    parser.add_argument("--profile", action="store_true",
+                        help="단계별(원문 분할, 마크다운 보호/복원, 모델 응답 대기, 상태 저장, 진행 표시 등) "
+                             "소요 시간을 재서 끝날 때 출력")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="--profile과 함께 tracemalloc으로 단계별 최대 할당과 할당이 많은 위치 출력")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="--profile과 함께 cProfile 결과를 pstats 파일로 저장 "
+                             "(--chapter-dir의 챕터 프로세스는 포함하지 않음)")
+
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    status_parser = subparsers.add_parser("status", help="번역 진행 상황만 빠르게 출력")
+    status_parser.add_argument("--state", "-s", default=argparse.SUPPRESS, help="상태 파일")
 
     args = parser.parse_args()
 
+    base_dir = Path(__file__).parent.parent
+    if not (args.profile or args.profile_memory or args.profile_out):
+        run(args, parser, base_dir)
+        return
+
+    profiler = StageProfiler(memory=args.profile_memory,
+                             cprofile_file=base_dir / args.profile_out if args.profile_out else None)
+    profiler.start()
+    try:
+        run(args, parser, base_dir)
+    finally:
+        profiler.stop()
+        profiler.report()
+
+
+def run(args, parser: argparse.ArgumentParser, base_dir: Path):
+    """명령줄 옵션에 따라 번역, 내보내기, 통계 실행"""
+    if args.command == "status":
+        show_status(base_dir / args.state)
+        return
+
+    cache_file = None if args.no_cache else str(base_dir / args.cache)
+    glossary_file = None if args.no_glossary else str(base_dir / args.glossary)
+    if glossary_file and not os.path.exists(glossary_file):
+        # 기본 용어집이 없으면 용어집 없이 진행, 직접 지정한 파일이 없으면 오류
+        if args.glossary != parser.get_default("glossary"):
+            print(f"용어집 파일을 찾을 수 없습니다: {glossary_file}")
+            exit(1)
+        glossary_file = None
+    hosts = [h.strip() for value in (args.host or ["http://localhost:11434"])
+             for h in value.split(",") if h.strip()]
+
     # 샘플 테스트 모드
     if args.sample:
-        run_sample_test(model=args.model, pages=args.sample, start_page=args.start)
+        run_sample_test(model=args.model, pages=args.sample, start_page=args.start,
+                        workers=args.workers, state_backend=args.state_backend,
+                        cache_file=cache_file, cache_size_mb=args.cache_size,
+                        max_pages_per_request=args.pack, stream=args.stream,
+                        max_output_ratio=args.max_output_ratio, host=hosts,
+                        keep_alive=args.keep_alive, warmup=not args.no_warmup,
+                        unload=args.unload, glossary_file=glossary_file,
+                        draft_model=args.draft_model)
         return
 
     # 경로 설정
-    base_dir = Path(__file__).parent.parent
     input_file = base_dir / args.input
     output_file = base_dir / args.output
     state_file = base_dir / args.state
 
+    options = dict(
+        model=args.model,
+        state_backend=args.state_backend,
+        cache_file=cache_file,
+        cache_size_mb=args.cache_size,
+        max_pages_per_request=args.pack,
+        stream=args.stream,
+        max_output_ratio=args.max_output_ratio,
+        host=hosts,
+        lease_seconds=args.lease,
+        keep_alive=args.keep_alive,
+        warmup=not args.no_warmup,
+        unload=args.unload,
+        glossary_file=glossary_file,
+        draft_model=args.draft_model
+    )
+
+    # 챕터 디렉터리 모드: 챕터별 상태는 <상태 파일 이름>.chapters/ 아래에 둔다
+    if args.chapter_dir:
+        chapters = ChapterDirTranslator(base_dir / args.chapter_dir,
+                                        state_file.with_suffix(".chapters"), base_dir, options,
+                                        processes=args.jobs)
+        if args.stats:
+            chapters.show_status()
+            return
+        if not args.export_only:
+            chapters.translate(resume=not args.no_resume, limit=args.limit, workers=args.workers)
+        chapters.merge(completed_only=args.completed_chapters)
+        return
+
     translator = BookTranslator(
         input_file=str(input_file),
         output_file=str(output_file),
         state_file=str(state_file),
-        model=args.model
+        **options
     )
 
-    if args.export_only:
-        translator.export()
+    stats_json = base_dir / args.stats_json if args.stats_json else None
+    stats_prom = base_dir / args.stats_prom if args.stats_prom else None
+
+    if args.stats:
+        report_stats(translator.state, stats_json, stats_prom)
+    elif args.export_only:
+        export_results(translator, base_dir, args)
     else:
-        translator.translate(resume=not args.no_resume, limit=args.limit)
-        translator.export()
+        translator.translate(resume=not args.no_resume, limit=args.limit, workers=args.workers)
+        export_results(translator, base_dir, args)
+        if stats_json or stats_prom:
+            report_stats(translator.state, stats_json, stats_prom, show=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,220 @@
+// 한국어 n-gram 검색 (scripts/split_chapters.py의 SearchIndexBuilder가 만든 src/search 색인 사용)
+//
+// mdBook 기본 검색은 책 전체 색인을 처음 검색할 때 한 번에 받는다. 여기서는 작은 index.json만
+// 먼저 받고, 검색어 조각이 들어 있는 terms/XX.json과 결과가 나온 문서의 docs/<문서>.json만 받는다.
+(function () {
+    "use strict";
+
+    var ROOT = (typeof path_to_root === "string" ? path_to_root : "") + "search/";
+    var TOKEN_PATTERN = /[가-힣ㄱ-ㆎ一-鿿]+|[0-9a-zÀ-ɏ]+/g;
+    var LIMIT = 30;
+
+    var cache = {};
+    var manifest = null;
+
+    function fetchJson(path) {
+        if (!cache[path]) {
+            cache[path] = fetch(ROOT + path).then(function (response) {
+                if (!response.ok) {
+                    throw new Error(path + ": " + response.status);
+                }
+                return response.json();
+            });
+        }
+        return cache[path];
+    }
+
+    function loadManifest() {
+        return fetchJson("index.json").then(function (data) {
+            manifest = data;
+            return data;
+        });
+    }
+
+    // SearchIndexBuilder.tokenize와 같은 규칙
+    function tokenize(text) {
+        var n = manifest.format.ngram;
+        var tokens = [];
+        (text.toLowerCase().match(TOKEN_PATTERN) || []).forEach(function (word) {
+            if (word[0] < "ㄱ" || word.length <= n) {
+                tokens.push(word);
+            } else {
+                for (var i = 0; i + n <= word.length; i++) {
+                    tokens.push(word.slice(i, i + n));
+                }
+            }
+        });
+        return tokens.filter(function (token, i) { return tokens.indexOf(token) === i; });
+    }
+
+    function bucketPath(token) {
+        var bucket = token.charCodeAt(0) % manifest.format.buckets;
+        return "terms/" + (bucket < 16 ? "0" : "") + bucket.toString(16) + ".json";
+    }
+
+    // 모든 조각이 들어 있는 절만 남기고 조각 빈도 합으로 정렬
+    function search(query) {
+        return loadManifest().then(function () {
+            var tokens = tokenize(query);
+            if (!tokens.length) {
+                return [];
+            }
+            return Promise.all(tokens.map(function (token) {
+                return fetchJson(bucketPath(token)).then(function (postings) {
+                    return postings[token] || {};
+                }, function () { return {}; });
+            })).then(function (lists) {
+                var scores = null;
+                lists.forEach(function (docs) {
+                    var next = {};
+                    Object.keys(docs).forEach(function (doc) {
+                        var postings = docs[doc];
+                        for (var i = 0; i < postings.length; i += 2) {
+                            var key = doc + "#" + postings[i];
+                            if (scores === null || key in scores) {
+                                next[key] = (scores === null ? 0 : scores[key]) + postings[i + 1];
+                            }
+                        }
+                    });
+                    scores = next;
+                });
+                var hits = Object.keys(scores).map(function (key) {
+                    var parts = key.split("#");
+                    return {doc: parts[0], section: Number(parts[1]), score: scores[key]};
+                });
+                hits.sort(function (a, b) { return b.score - a.score; });
+                return hits.slice(0, LIMIT);
+            });
+        }).then(function (hits) {
+            return Promise.all(hits.map(function (hit) {
+                return fetchJson("docs/" + hit.doc + ".json").then(function (sections) {
+                    var doc = manifest.documents[hit.doc];
+                    var section = sections[hit.section];
+                    return {
+                        url: (typeof path_to_root === "string" ? path_to_root : "") + doc.path
+                            + (section[0] ? "#" + section[0] : ""),
+                        title: section[1] === doc.title ? doc.title : doc.title + " › " + section[1],
+                        teaser: section[2]
+                    };
+                });
+            }));
+        });
+    }
+
+    var STYLE = [
+        "#ko-search{display:none;position:fixed;top:var(--menu-bar-height,50px);left:0;right:0;",
+        "z-index:200;max-height:70vh;overflow-y:auto;padding:10px 15px;background:var(--bg);",
+        "border-bottom:1px solid var(--searchresults-border-color)}",
+        "#ko-search.open{display:block}",
+        "#ko-search input{width:100%;box-sizing:border-box;padding:8px 12px;font-size:16px;",
+        "color:var(--searchbar-fg);background:var(--searchbar-bg);",
+        "border:1px solid var(--searchbar-border-color);border-radius:3px}",
+        "#ko-search .ko-search-status{margin:8px 0;color:var(--searchresults-header-fg)}",
+        "#ko-search ul{list-style:none;margin:0;padding:0}",
+        "#ko-search li{padding:6px 0;border-bottom:1px solid var(--searchresults-border-color)}",
+        "#ko-search li p{margin:4px 0 0;font-size:0.9em;color:var(--fg)}"
+    ].join("");
+
+    function init() {
+        var buttons = document.querySelector(".left-buttons");
+        if (!buttons) {
+            return;
+        }
+        var style = document.createElement("style");
+        style.textContent = STYLE;
+        document.head.appendChild(style);
+
+        var toggle = document.createElement("button");
+        toggle.className = "icon-button";
+        toggle.type = "button";
+        toggle.title = "검색 (/)";
+        toggle.setAttribute("aria-label", "검색");
+        toggle.innerHTML = '<span class="fa-svg"><svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 512 512">'
+            + '<path d="M416 208c0 45.9-14.9 88.3-40 122.7L502.6 457.4c12.5 12.5 12.5 32.8 0 45.3s-32.8 12.5-45.3 0'
+            + 'L330.7 376c-34.4 25.2-76.8 40-122.7 40C93.1 416 0 322.9 0 208S93.1 0 208 0S416 93.1 416 208zM208 352'
+            + 'c79.5 0 144-64.5 144-144s-64.5-144-144-144S64 128.5 64 208s64.5 144 144 144z"/></svg></span>';
+        buttons.appendChild(toggle);
+
+        var panel = document.createElement("div");
+        panel.id = "ko-search";
+        panel.innerHTML = '<input type="search" placeholder="책에서 검색 ..." aria-label="검색어">'
+            + '<div class="ko-search-status"></div><ul></ul>';
+        document.body.appendChild(panel);
+        var input = panel.querySelector("input");
+        var status = panel.querySelector(".ko-search-status");
+        var list = panel.querySelector("ul");
+
+        function open() {
+            panel.classList.add("open");
+            input.focus();
+            loadManifest().catch(function () {
+                status.textContent = "검색 색인을 불러오지 못했습니다.";
+            });
+        }
+
+        function close() {
+            panel.classList.remove("open");
+        }
+
+        var pending = 0;
+        function run() {
+            var query = input.value.trim();
+            var id = ++pending;
+            if (!query) {
+                status.textContent = "";
+                list.innerHTML = "";
+                return;
+            }
+            search(query).then(function (results) {
+                if (id !== pending) {
+                    return;
+                }
+                status.textContent = results.length ? results.length + "개 결과" : "검색 결과가 없습니다.";
+                list.innerHTML = "";
+                results.forEach(function (result) {
+                    var item = document.createElement("li");
+                    var link = document.createElement("a");
+                    link.href = result.url;
+                    link.textContent = result.title;
+                    link.addEventListener("click", close);
+                    var teaser = document.createElement("p");
+                    teaser.textContent = result.teaser;
+                    item.appendChild(link);
+                    item.appendChild(teaser);
+                    list.appendChild(item);
+                });
+            }, function () {
+                status.textContent = "검색 색인을 불러오지 못했습니다.";
+            });
+        }
+
+        var timer = null;
+        input.addEventListener("input", function () {
+            clearTimeout(timer);
+            timer = setTimeout(run, 150);
+        });
+        toggle.addEventListener("click", function () {
+            if (panel.classList.contains("open")) {
+                close();
+            } else {
+                open();
+            }
+        });
+        document.addEventListener("keydown", function (event) {
+            if (event.key === "Escape" && panel.classList.contains("open")) {
+                close();
+            } else if ((event.key === "/" || event.key === "s") && !panel.classList.contains("open")
+                       && !/^(INPUT|TEXTAREA|SELECT)$/.test(document.activeElement.tagName)
+                       && !event.ctrlKey && !event.metaKey && !event.altKey) {
+                event.preventDefault();
+                open();
+            }
+        });
+    }
+
+    if (document.readyState === "loading") {
+        document.addEventListener("DOMContentLoaded", init);
+    } else {
+        init();
+    }
+})();